@@ -0,0 +1,176 @@
+"""
+AI-Driven Price Forecasting System - Analytics Cube
+Price statistics pre-aggregated by entity and calendar dimensions, updated as rows arrive
+"""
+
+import pandas as pd
+import numpy as np
+import threading
+from features import DAY_NAMES, SEASON_NAMES, MONTH_SEASON_CODES, vocabulary_codes
+
+# Calendar axes of a cube cell after the entity axis, and the labels along each
+CELL_AXES = {
+    'month': list(range(1, 13)),
+    'day_of_week': DAY_NAMES,
+}
+
+# Dimensions a summary can be grouped by: the cell axis each is a function
+# of, the group of every label along that axis, and the group labels
+SUMMARY_DIMENSIONS = {
+    'month': ('month', np.arange(12), list(range(1, 13))),
+    'season': ('month', MONTH_SEASON_CODES[1:].astype(np.int64), SEASON_NAMES),
+    'day_of_week': ('day_of_week', np.arange(7), DAY_NAMES),
+    'is_weekend': ('day_of_week', (np.arange(7) >= 5).astype(np.int64), [0, 1]),
+}
+
+# Running aggregates kept per cell, and their value for a cell with no rows
+CELL_IDENTITIES = {'count': 0, 'sum': 0.0, 'sumsq': 0.0, 'min': np.inf, 'max': -np.inf}
+
+def entity_codes(frame, entity_columns):
+    """Dense entity code per row and the display label of each code
+
+    Entities are the distinct combinations of `entity_columns` (e.g.
+    "ATL → JFK"), coded in category order; with no entity columns every
+    row belongs to one entity labelled ''.
+    """
+    columns = [frame[col].astype('category') for col in entity_columns if col in frame.columns]
+    combined = np.zeros(len(frame), dtype=np.int64)
+    for values in columns:
+        combined = combined * len(values.cat.categories) + values.cat.codes.to_numpy()
+    _, first_rows, codes = np.unique(combined, return_index=True, return_inverse=True)
+
+    # Label each entity from the category values of its first row
+    parts = [values.cat.categories.astype(str)[values.cat.codes.to_numpy()[first_rows]] for values in columns]
+    labels = [" → ".join(names) for names in zip(*parts)] if parts else [''] * len(first_rows)
+    return codes.reshape(-1), labels
+
+def dimension_codes(frame, col, labels):
+    """Position of each row's `col` value along its cube axis"""
+    values = frame[col]
+    if pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.to_numpy(dtype=np.int64) - labels[0]
+    else:
+        values = values.astype('category')
+        row_codes = values.cat.codes.to_numpy()
+        codes = np.where(row_codes >= 0, vocabulary_codes(values.cat.categories, labels)[row_codes], -1)
+    if codes.size and (codes.min() < 0 or codes.max() >= len(labels)):
+        raise ValueError(f"Unexpected {col} values; expected one of {labels}")
+    return codes
+
+def cell_statistics(count, total, sumsq, low, high):
+    """count, mean, std (sample), min and max from reduced cell aggregates"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, np.nan)
+        variance = np.where(count > 1, (sumsq - total * mean) / (count - 1), np.nan)
+    return {
+        'count': count,
+        'mean': mean,
+        'std': np.sqrt(np.maximum(variance, 0)),
+        'min': np.where(count > 0, low, np.nan),
+        'max': np.where(count > 0, high, np.nan),
+    }
+
+class PriceCube:
+    """count/sum/sumsq/min/max of price per (entity, month, day_of_week) cell
+
+    That is 84 cells per entity: season and is_weekend are fixed by month
+    and day of week, so their summaries group cells instead of being
+    stored. `summary` and `stats` reduce cells, not rows, so the analytics
+    views cost the same however long the history grows.
+
+    `add` folds appended rows into the cells in place, in time
+    proportional to the new rows; the entity axis grows with spare
+    capacity, so new hotels/routes rarely reallocate it. A lock keeps
+    readers from seeing a half-applied add. Entities are identified by
+    their labels (see `entity_codes`).
+    """
+
+    def __init__(self, entity_columns=()):
+        self.entity_columns = tuple(entity_columns)
+        self.entities = []
+        self._positions = {}
+        self.cells = self._empty_cells(0)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty_cells(capacity):
+        shape = (capacity,) + tuple(len(labels) for labels in CELL_AXES.values())
+        return {name: np.full(shape, identity) for name, identity in CELL_IDENTITIES.items()}
+
+    @classmethod
+    def from_frame(cls, frame, entity_columns=()):
+        """Aggregate every row of a price frame"""
+        cube = cls(entity_columns)
+        cube.add(frame)
+        return cube
+
+    def add(self, frame):
+        """Fold the rows of `frame` into the cells"""
+        codes, labels = entity_codes(frame, self.entity_columns)
+        axes = [dimension_codes(frame, col, names) for col, names in CELL_AXES.items()]
+        price = frame['price'].to_numpy(dtype=np.float64)
+
+        with self._lock:
+            for label in labels:
+                if label not in self._positions:
+                    self._positions[label] = len(self.entities)
+                    self.entities.append(label)
+            self._reserve(len(self.entities))
+
+            rows = np.array([self._positions[label] for label in labels], dtype=np.int64)[codes]
+            flat = np.ravel_multi_index([rows] + axes, self.cells['count'].shape)
+            np.add.at(self.cells['count'].reshape(-1), flat, 1)
+            np.add.at(self.cells['sum'].reshape(-1), flat, price)
+            np.add.at(self.cells['sumsq'].reshape(-1), flat, price * price)
+            np.minimum.at(self.cells['min'].reshape(-1), flat, price)
+            np.maximum.at(self.cells['max'].reshape(-1), flat, price)
+
+    def _reserve(self, n_entities):
+        """Make room for `n_entities`, at least doubling the capacity when it grows"""
+        capacity = len(self.cells['count'])
+        if n_entities <= capacity:
+            return
+        cells = self._empty_cells(max(n_entities, 2 * capacity, 16))
+        for name, values in self.cells.items():
+            cells[name][:capacity] = values
+        self.cells = cells
+
+    def _entity_cells(self, entity):
+        """(month, day_of_week) aggregates of `entity`, or of every entity when None"""
+        with self._lock:
+            if entity is None:
+                selected = slice(0, len(self.entities))
+            elif entity in self._positions:
+                selected = slice(self._positions[entity], self._positions[entity] + 1)
+            else:
+                raise KeyError(f"Unknown entity {entity!r}")
+            cells = {name: self.cells[name][selected] for name in ('count', 'sum', 'sumsq')}
+            cells = {name: values.sum(axis=0) for name, values in cells.items()}
+            cells['min'] = self.cells['min'][selected].min(axis=0, initial=np.inf)
+            cells['max'] = self.cells['max'][selected].max(axis=0, initial=-np.inf)
+            return cells
+
+    def summary(self, by, entity=None):
+        """Price statistics for every label of the `by` dimension (NaN where it has no rows)"""
+        axis_name, groups, names = SUMMARY_DIMENSIONS[by]
+        other = 1 - list(CELL_AXES).index(axis_name)
+        cells = self._entity_cells(entity)
+
+        grouped = {
+            name: np.bincount(groups, weights=cells[name].sum(axis=other), minlength=len(names))
+            for name in ('count', 'sum', 'sumsq')
+        }
+        low = np.full(len(names), np.inf)
+        high = np.full(len(names), -np.inf)
+        np.minimum.at(low, groups, cells['min'].min(axis=other))
+        np.maximum.at(high, groups, cells['max'].max(axis=other))
+
+        statistics = cell_statistics(grouped['count'].astype(np.int64), grouped['sum'], grouped['sumsq'], low, high)
+        return pd.DataFrame(statistics, index=pd.Index(names, name=by))
+
+    def stats(self, entity=None):
+        """Overall price statistics (the count/mean/std/min/max of `describe`)"""
+        cells = self._entity_cells(entity)
+        return pd.Series(cell_statistics(
+            cells['count'].sum(), cells['sum'].sum(), cells['sumsq'].sum(), cells['min'].min(), cells['max'].max()
+        ), dtype=np.float64)
@@ -6,14 +6,17 @@ Built for Puduvai Youth Fest 2026 AI Hackathon
 """
 
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 import os
 import time
-from model import PriceForecastingModel
+from inference import cached_forecast
+from registry import ModelRegistry
+from data_store import PriceHistory
+from data_generator import ENTITY_COLUMNS
+from features import SEASON_NAMES, MONTH_SEASON_CODES
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PAGE CONFIGURATION
@@ -1114,29 +1117,51 @@ st.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
 # ═══════════════════════════════════════════════════════════════════════════════
 # PERFORMANCE OPTIMIZED DATA LOADING
 # ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=3600, show_spinner=False)
+@st.cache_resource(show_spinner=False)
+def price_histories():
+    """Process-wide price history sources, shared by every session"""
+    return (
+        PriceHistory('data/hotel_prices.csv', entity_columns=ENTITY_COLUMNS['hotel']),
+        PriceHistory('data/flight_prices.csv', entity_columns=ENTITY_COLUMNS['flight'])
+    )
+
 def load_data():
-    """Load and cache historical data for optimal performance"""
+    """Date index and analytics cube of each history, re-reading only what changed on disk since the last rerun"""
     try:
-        hotel_data = pd.read_csv('data/hotel_prices.csv')
-        flight_data = pd.read_csv('data/flight_prices.csv')
-        hotel_data['date'] = pd.to_datetime(hotel_data['date'])
-        flight_data['date'] = pd.to_datetime(flight_data['date'])
-        return hotel_data, flight_data
+        hotel_history, flight_history = price_histories()
+        return hotel_history.views(), flight_history.views()
     except FileNotFoundError:
         return None, None
 
+def select_entity(index, service_name):
+    """Let the user focus on one hotel or route when the history holds several
+    
+    Returns the entity code to slice `index` with (None for single-entity histories).
+    """
+    labels = index.entities()
+    if len(labels) < 2:
+        return None
+    
+    with st.sidebar:
+        title = "🏨 PROPERTY" if service_name == "Hotel" else "🛫 ROUTE"
+        st.markdown(f'<div class="sidebar-section-title">{title}</div>', unsafe_allow_html=True)
+        selected = st.selectbox(
+            "Select Entity",
+            list(labels),
+            format_func=labels.get,
+            label_visibility="collapsed"
+        )
+    
+    return selected
+
 @st.cache_resource(show_spinner=False)
+def model_registry():
+    """Process-wide model registry; retrained models are picked up without a restart"""
+    return ModelRegistry('models').start()
+
 def load_models():
-    """Load and cache ML models"""
-    try:
-        hotel_model = PriceForecastingModel('hotel')
-        hotel_model.load_model('models/hotel_model.pkl')
-        flight_model = PriceForecastingModel('flight')
-        flight_model.load_model('models/flight_model.pkl')
-        return hotel_model, flight_model
-    except FileNotFoundError:
-        return None, None
+    """Current hotel and flight models (None until they have loaded)"""
+    return model_registry().models()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PREMIUM CHART FUNCTIONS
@@ -1289,11 +1314,10 @@ def create_historical_chart(data, title):
     
     return fig
 
-def create_day_analysis_chart(data):
-    """Create day-of-week price analysis chart"""
+def create_day_analysis_chart(day_stats):
+    """Create day-of-week price analysis chart from per-day statistics (Monday first)"""
     
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_avg = data.groupby('day_of_week')['price'].mean().reindex(day_order)
+    day_avg = day_stats['mean']
     
     colors = ['#6366f1' if i < 5 else '#8b5cf6' for i in range(7)]
     
@@ -1326,13 +1350,10 @@ def create_day_analysis_chart(data):
     
     return fig
 
-def create_season_chart(data):
-    """Create seasonal price analysis chart"""
+def create_season_chart(season_stats):
+    """Create seasonal price analysis chart from per-season statistics"""
     
-    season_avg = data.groupby('season')['price'].agg(['mean', 'min', 'max']).reset_index()
-    season_order = ['Spring', 'Summer', 'Fall', 'Winter']
-    season_avg['season'] = pd.Categorical(season_avg['season'], categories=season_order, ordered=True)
-    season_avg = season_avg.sort_values('season')
+    season_avg = season_stats[season_stats['count'] > 0].reset_index()
     
     colors = {'Spring': '#10b981', 'Summer': '#f59e0b', 'Fall': '#8b5cf6', 'Winter': '#06b6d4'}
     
@@ -1601,10 +1622,10 @@ def main():
     """Main application entry point"""
     
     # Load data and models
-    hotel_data, flight_data = load_data()
+    hotel_views, flight_views = load_data()
     hotel_model, flight_model = load_models()
     
-    if hotel_data is None or hotel_model is None:
+    if hotel_views is None or hotel_model is None:
         st.error("⚠️ System initialization failed. Please run setup first.")
         st.code("python data_generator.py\npython model.py", language="bash")
         st.stop()
@@ -1617,33 +1638,33 @@ def main():
     
     # Select appropriate data and model
     if "Hotel" in service_type:
-        data = hotel_data
+        index, cube = hotel_views
         model = hotel_model
         service_name = "Hotel"
         service_icon = "🏨"
     else:
-        data = flight_data
+        index, cube = flight_views
         model = flight_model
         service_name = "Flight"
         service_icon = "✈️"
     
-    # Create prediction data
+    # Multi-entity histories are analysed one hotel/route at a time
+    entity = select_entity(index, service_name)
+    entity_label = None if entity is None else index.labels[entity]
+    
     current_date = datetime.now().date()
-    current_data = pd.DataFrame([{
-        'date': current_date,
-        'day_of_week': current_date.strftime('%A'),
-        'month': current_date.month,
-        'is_weekend': 1 if current_date.weekday() >= 5 else 0,
-        'season': model._get_season(current_date.month),
-        'demand_score': 105,
-        'advance_booking_days': 30 if "Flight" in service_type else None
-    }])
     
     try:
-        # Get predictions
-        current_price = model.predict(current_data)[0]
-        future_dates, future_prices = model.predict_future_trend(current_date, days_ahead=prediction_days)
-        recommendation_data = model.get_recommendation(current_price, future_prices)
+        # Get predictions (shared across reruns and sessions until midnight)
+        forecast = cached_forecast(
+            model, current_date, prediction_days,
+            demand_score=105,
+            advance_booking_days=30 if "Flight" in service_type else None
+        )
+        current_price = forecast['current_price']
+        future_dates = list(forecast['future_dates'])
+        future_prices = forecast['future_prices']
+        recommendation_data = forecast['recommendation']
         
         # Determine recommendation type
         if recommendation_data['price_change_percent'] > 5:
@@ -1733,7 +1754,7 @@ def main():
             st.markdown("### 📈 Historical Price Analysis")
             
             # Historical chart
-            recent_data = data.tail(90).copy()
+            recent_data = index.last_days(90, entity)
             hist_chart = create_historical_chart(recent_data, f"{service_name} Prices (Last 90 Days)")
             st.plotly_chart(hist_chart, use_container_width=True)
             
@@ -1741,18 +1762,18 @@ def main():
             col1, col2 = st.columns(2)
             
             with col1:
-                day_chart = create_day_analysis_chart(data)
+                day_chart = create_day_analysis_chart(cube.summary('day_of_week', entity_label))
                 st.plotly_chart(day_chart, use_container_width=True)
             
             with col2:
-                season_chart = create_season_chart(data)
+                season_chart = create_season_chart(cube.summary('season', entity_label))
                 st.plotly_chart(season_chart, use_container_width=True)
             
             # Statistics
             st.markdown("### 📊 Price Statistics")
             
             stats_cols = st.columns(4)
-            price_stats = data['price'].describe()
+            price_stats = cube.stats(entity_label)
             
             stats_data = [
                 ("📊", "Average", f"${price_stats['mean']:.2f}", "primary"),
@@ -1772,13 +1793,12 @@ def main():
             st.markdown("### 🤖 AI-Powered Insights")
             
             # Why this prediction
-            weekend_avg = data[data['is_weekend'] == 1]['price'].mean()
-            weekday_avg = data[data['is_weekend'] == 0]['price'].mean()
+            weekend_avg, weekday_avg = cube.summary('is_weekend', entity_label)['mean'].loc[[1, 0]]
             weekend_diff = ((weekend_avg - weekday_avg) / weekday_avg) * 100
             
             factors = [
                 {"icon": "📅", "name": "Day Type", "value": f"{'Weekend' if current_date.weekday() >= 5 else 'Weekday'} pricing", "impact": "neutral"},
-                {"icon": "🌡️", "name": "Season", "value": f"{model._get_season(current_date.month)} demand", "impact": "positive" if current_date.month in [6,7,8,12] else "neutral"},
+                {"icon": "🌡️", "name": "Season", "value": f"{SEASON_NAMES[MONTH_SEASON_CODES[current_date.month]]} demand", "impact": "positive" if current_date.month in [6,7,8,12] else "neutral"},
                 {"icon": "📈", "name": "Trend", "value": f"{recommendation_data['price_change_percent']:.1f}% expected change", "impact": "negative" if recommendation_data['price_change_percent'] > 0 else "positive"},
                 {"icon": "⏰", "name": "Timing", "value": f"{prediction_days} days forecast window", "impact": "neutral"}
             ]
@@ -1793,11 +1813,11 @@ def main():
             if weekend_diff > 10:
                 insights.append(("💰", "Weekend Premium", f"Weekends are {weekend_diff:.0f}% more expensive. Consider weekday travel for savings!"))
             
-            season_avg = data.groupby('season')['price'].mean()
+            season_avg = cube.summary('season', entity_label)['mean']
             cheapest_season = season_avg.idxmin()
             insights.append(("🌸", "Best Season", f"{cheapest_season} offers the lowest average prices at ${season_avg[cheapest_season]:.0f}"))
             
-            avg_price = data['price'].mean()
+            avg_price = price_stats['mean']
             if current_price < avg_price * 0.9:
                 insights.append(("🎯", "Great Deal!", f"Current price is {((avg_price - current_price)/avg_price)*100:.0f}% below average - excellent value!"))
             elif current_price > avg_price * 1.1:
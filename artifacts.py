@@ -0,0 +1,74 @@
+"""
+AI-Driven Price Forecasting System - Model Artifacts
+Versioned model files readable with NumPy alone: a JSON manifest plus .npy arrays
+"""
+
+import numpy as np
+import json
+import os
+import shutil
+import time
+
+# Bumped whenever the manifest or array layout changes incompatibly
+ARTIFACT_SCHEMA_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+def write_artifact(path, manifest, arrays):
+    """Write `manifest` and named arrays as an artifact directory at `path`
+
+    Arrays are stored as one uncompressed .npy file each (so they can be
+    memory-mapped) and the manifest records their names along with the
+    schema version. The directory is assembled under a temporary name and
+    renamed into place, so readers never see a half-written artifact.
+    """
+    staging = f'{path}.{os.getpid()}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for name, values in arrays.items():
+        np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(values), allow_pickle=False)
+
+    manifest = dict(manifest, schema_version=ARTIFACT_SCHEMA_VERSION, arrays=sorted(arrays),
+                    created=time.strftime('%Y-%m-%dT%H:%M:%S'))
+    with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap in the new directory, keeping the old one only until the rename succeeds
+    retired = None
+    if os.path.exists(path):
+        retired = f'{path}.{os.getpid()}.old'
+        os.rename(path, retired)
+    os.rename(staging, path)
+    if retired is not None:
+        shutil.rmtree(retired)
+
+def read_manifest(path):
+    """Manifest of the artifact at `path`, checked against the supported schema version"""
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('schema_version', 0) > ARTIFACT_SCHEMA_VERSION:
+        raise ValueError(f"Artifact {path} uses schema version {manifest['schema_version']}; "
+                         f"this code reads up to {ARTIFACT_SCHEMA_VERSION}")
+    return manifest
+
+def read_artifact(path, mmap=True):
+    """Manifest and arrays of the artifact at `path`
+
+    With `mmap`, arrays are read-only memory maps, so opening even a large
+    fleet costs only the manifest parse.
+    """
+    manifest = read_manifest(path)
+    arrays = {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None, allow_pickle=False)
+        for name in manifest['arrays']
+    }
+    return manifest, arrays
+
+def is_artifact(path):
+    """True if `path` is an artifact directory"""
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+def entity_keys_from_json(keys):
+    """Entity keys as stored in a manifest; JSON turns route tuples into lists"""
+    return [tuple(key) if isinstance(key, list) else key for key in keys]
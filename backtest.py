@@ -0,0 +1,167 @@
+"""
+AI-Driven Price Forecasting System - Backtesting
+Rolling-origin evaluation of the price models by forecast horizon
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from features import date_ordinals
+from model import PriceForecastingModel, NormalEquations, iter_price_chunks
+from fleet import grouped_normal_equations
+
+# Arrays shared by every fold, set once per worker process
+_FOLD_DATA = {}
+
+def _init_fold_worker(fold_data):
+    """Pool initializer: keep the shared fold arrays for this process"""
+    _FOLD_DATA.update(fold_data)
+
+def _evaluate_folds(origins):
+    """Fit at each origin from prefix statistics and score the following `horizon` days"""
+    data = _FOLD_DATA
+    horizon, window_days = data['horizon'], data['window_days']
+    n_days = len(data['day_starts']) - 1
+    abs_error, sq_error, n_rows = np.zeros(horizon), np.zeros(horizon), np.zeros(horizon)
+    folds = []
+    
+    for origin in origins:
+        # Training statistics of days [start, origin) are a difference of prefix sums
+        start = 0 if window_days is None else max(0, origin - window_days)
+        stats = NormalEquations.from_dict({
+            name: data[name][origin] - data[name][start] for name in ('xtx', 'xty', 'yty', 'n_rows')
+        })
+        coef, intercept = stats.solve()
+        
+        # Rows are sorted by day, so the test window is one contiguous slice
+        rows = slice(data['day_starts'][origin], data['day_starts'][min(origin + horizon, n_days)])
+        residual = data['y'][rows] - (data['X'][rows] @ coef + intercept)
+        lead = data['day'][rows] - origin
+        
+        abs_error += np.bincount(lead, weights=np.abs(residual), minlength=horizon)
+        sq_error += np.bincount(lead, weights=residual ** 2, minlength=horizon)
+        n_rows += np.bincount(lead, minlength=horizon)
+        folds.append((origin, int(stats.n_rows), np.abs(residual).mean()))
+    
+    return abs_error, sq_error, n_rows, folds
+
+def plan_origins(n_days, horizon=30, min_train_days=365, step=1):
+    """Forecast origins (day offsets) with at least `min_train_days` of history and a full horizon ahead"""
+    return np.arange(min_train_days, n_days - horizon + 1, step)
+
+def rolling_origin_backtest(df, model_type='hotel', horizon=30, min_train_days=365, step=1,
+                            window_days=None, n_workers=None):
+    """Rolling-origin backtest of the linear price model
+    
+    Every `step` days a model is fitted on the history before the origin
+    (all of it, or the last `window_days`) and scored on the next `horizon`
+    days. The feature matrix is built once, sorted by date; per-day
+    normal-equation statistics are prefix-summed so each fold's fit costs
+    one small solve, and folds are spread over a process pool. Returns MAE
+    and RMSE by horizon (1 = the origin day itself) and a per-fold table.
+    
+    Keep `step` off multiples of 7: with weekly origins every fold starts on
+    the same weekday, so each horizon always lands on the same day of the
+    week and the error by horizon measures day-of-week effects rather than
+    lead time. The default scores a fold from every day.
+    """
+    
+    model = PriceForecastingModel(model_type)
+    
+    # Featurize once, with rows in date order
+    day = date_ordinals(df['date'])
+    order = np.argsort(day, kind='stable')
+    data, model.feature_columns = model._feature_arrays(df)
+    X = model._stack_features(data, len(df))[order]
+    y = df['price'].to_numpy(dtype=np.float64)[order]
+    day = day[order] - day[order[0]]
+    n_days = int(day[-1]) + 1
+    
+    origins = plan_origins(n_days, horizon, min_train_days, step)
+    if not len(origins):
+        raise ValueError(f"Need more than {min_train_days + horizon} days of history, got {n_days}")
+    
+    print(f"🔁 Backtesting {model_type} model over {len(origins)} origins, "
+          f"{horizon}-day horizon, {n_workers or os.cpu_count()} workers...")
+    
+    # Per-day statistics, prefix-summed so entry d covers days [0, d)
+    xtx, xty = grouped_normal_equations(X, y, day, n_days)
+    per_day = {
+        'xtx': xtx,
+        'xty': xty,
+        'yty': np.bincount(day, weights=y ** 2, minlength=n_days),
+        'n_rows': np.bincount(day, minlength=n_days).astype(np.float64)
+    }
+    fold_data = {
+        name: np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+        for name, values in per_day.items()
+    }
+    fold_data.update({
+        'X': X, 'y': y, 'day': day, 'horizon': horizon, 'window_days': window_days,
+        'day_starts': np.searchsorted(day, np.arange(n_days + 1))
+    })
+    
+    # Contiguous blocks of origins, a few per worker
+    n_blocks = min(len(origins), 4 * (n_workers or os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_fold_worker,
+                             initargs=(fold_data,)) as pool:
+        results = list(pool.map(_evaluate_folds, np.array_split(origins, n_blocks)))
+    
+    abs_error = sum(result[0] for result in results)
+    sq_error = sum(result[1] for result in results)
+    n_rows = sum(result[2] for result in results)
+    
+    first_date = pd.Timestamp(np.sort(df['date'].to_numpy(dtype='datetime64[D]'))[0])
+    folds = pd.DataFrame(
+        [fold for result in results for fold in result[3]],
+        columns=['origin', 'train_rows', 'mae']
+    )
+    folds['origin'] = first_date + pd.to_timedelta(folds['origin'], unit='D')
+    
+    by_horizon = pd.DataFrame({
+        'mae': abs_error / n_rows,
+        'rmse': np.sqrt(sq_error / n_rows),
+        'n_rows': n_rows.astype(np.int64)
+    }, index=pd.RangeIndex(1, horizon + 1, name='horizon'))
+    
+    return {'mae': abs_error.sum() / n_rows.sum(), 'by_horizon': by_horizon, 'folds': folds}
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the hotel and flight price models")
+    parser.add_argument('--horizon', type=int, default=30, help="days forecast from each origin")
+    parser.add_argument('--step', type=int, default=1,
+                        help="days between origins (avoid multiples of 7, which fix each horizon's weekday)")
+    parser.add_argument('--min-train-days', type=int, default=365, help="history before the first origin")
+    parser.add_argument('--window-days', type=int, default=None,
+                        help="train on a sliding window of this many days instead of all history")
+    parser.add_argument('--workers', type=int, default=None, help="processes evaluating folds")
+    parser.add_argument('--hotel-data', default='data/hotel_prices.csv',
+                        help="hotel CSV, Parquet/Feather file or partitioned directory")
+    parser.add_argument('--flight-data', default='data/flight_prices.csv',
+                        help="flight CSV, Parquet/Feather file or partitioned directory")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Backtest both models and print MAE by horizon"""
+    args = parse_args(argv)
+    
+    if not os.path.exists(args.hotel_data) or not os.path.exists(args.flight_data):
+        print("❌ Data files not found. Please run data_generator.py first.")
+        return
+    
+    for model_type, path in (('hotel', args.hotel_data), ('flight', args.flight_data)):
+        df = pd.concat(iter_price_chunks(path, 1_000_000), ignore_index=True)
+        results = rolling_origin_backtest(df, model_type, args.horizon, args.min_train_days, args.step,
+                                          args.window_days, args.workers)
+        
+        by_horizon = results['by_horizon']
+        shown = sorted({h for h in (1, 7, 14, 30, args.horizon) if h <= args.horizon})
+        print(f"📊 {model_type.title()} backtest MAE: ${results['mae']:.2f}")
+        for h in shown:
+            print(f"   {h:>3}-day horizon: MAE ${by_horizon.loc[h, 'mae']:.2f}, RMSE ${by_horizon.loc[h, 'rmse']:.2f}")
+
+if __name__ == "__main__":
+    main()
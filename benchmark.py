@@ -0,0 +1,170 @@
+"""
+AI-Driven Price Forecasting System - Benchmarks
+Micro-benchmarks for the prediction hot paths
+"""
+
+import contextlib
+import io
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from features import SEASON_NAMES, MONTH_SEASON_CODES
+from model import PriceForecastingModel
+from fleet import PriceModelFleet
+from inference import ForecastCache, PriceInferenceModel, cached_forecast
+
+def load_quietly(model_type):
+    """Load a trained model without the load banner"""
+    model = PriceForecastingModel(model_type)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.load_model(f'models/{model_type}_model.pkl')
+    return model
+
+def prediction_rows(model_type, n_rows):
+    """Prediction input shaped like the app's current-price request"""
+    dates = pd.date_range(date.today(), periods=n_rows, freq='D')
+    return pd.DataFrame({
+        'date': dates,
+        'day_of_week': dates.day_name(),
+        'month': dates.month,
+        'is_weekend': (dates.weekday >= 5).astype(int),
+        'season': np.array(SEASON_NAMES)[MONTH_SEASON_CODES[dates.month]],
+        'demand_score': 105.0,
+        'advance_booking_days': 30 if model_type == 'flight' else None
+    })
+
+def time_call(func, repeat):
+    """Median wall time of `func()` in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1e3
+
+def benchmark_inference(model_type='hotel', repeat=200):
+    """Compare the sklearn prediction path with the NumPy inference kernel"""
+    model = load_quietly(model_type)
+
+    print(f"\n⏱️ {model_type.title()} model inference latency (median ms)")
+    print(f"   {'rows':>6}  {'sklearn':>9}  {'kernel':>9}  {'matrix only':>11}  {'speedup':>7}")
+
+    for n_rows in (1, 10_000):
+        df = prediction_rows(model_type, n_rows)
+        X = model.feature_matrix(df)
+        n_repeat = repeat if n_rows == 1 else max(5, repeat // 20)
+
+        sklearn_ms = time_call(lambda: model.model.predict(model.prepare_features(df)), n_repeat)
+        kernel_ms = time_call(lambda: model.predict(df), n_repeat)
+        matrix_ms = time_call(lambda: model.predict_matrix(X), n_repeat)
+
+        # Both paths must agree before their timings mean anything
+        expected = model.model.predict(model.prepare_features(df))
+        np.testing.assert_allclose(model.predict(df), expected, rtol=1e-9)
+
+        print(f"   {n_rows:>6}  {sklearn_ms:>9.3f}  {kernel_ms:>9.3f}  {matrix_ms:>11.4f}  {sklearn_ms / kernel_ms:>6.1f}x")
+
+def benchmark_batch(model_type='hotel', repeat=100):
+    """Latency of predict_many over growing date grids"""
+    model = load_quietly(model_type)
+    dates = pd.date_range(date.today(), periods=10_000, freq='D')
+
+    print(f"\n⏱️ {model_type.title()} predict_many latency (median ms)")
+    for n_dates in (1, 365, 10_000):
+        grid = dates[:n_dates]
+        print(f"   {n_dates:>6} dates  {time_call(lambda: model.predict_many(grid), repeat):>8.3f}")
+
+def benchmark_fleet(model_type='hotel', repeat=3):
+    """Batched fleet training vs one LinearRegression fit per entity"""
+    from sklearn.linear_model import LinearRegression
+    
+    df = pd.read_csv(f'data/{model_type}_prices.csv')
+    fleet = PriceModelFleet(model_type)
+    if fleet.featurizer.entity_keys(df) is None:
+        print(f"\n⚠️ {model_type.title()} data has no entity keys; skipping fleet benchmark")
+        return
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        fleet_ms = time_call(lambda: fleet.train(df), repeat)
+    
+    codes = fleet.featurizer.encode_entities(df)
+    y = df['price'].to_numpy()
+    
+    def fit_each_entity():
+        X = fleet.featurizer.feature_matrix(df)
+        for code in range(len(fleet.entity_vocab)):
+            rows = codes == code
+            LinearRegression().fit(X[rows], y[rows])
+    
+    loop_ms = time_call(fit_each_entity, repeat)
+    
+    print(f"\n⏱️ {model_type.title()} fleet training, {len(fleet.entity_vocab)} entities (median ms)")
+    print(f"   per-entity loop {loop_ms:>9.1f}  batched {fleet_ms:>9.1f}  {loop_ms / fleet_ms:>6.1f}x")
+
+def stress_concurrency(model_type='hotel', n_threads=16, n_requests=2000, seed=0):
+    """Hammer one shared inference model from a thread pool and check every result
+    
+    Each request runs a forecast (through a shared forecast cache) and a
+    batch prediction; threaded results must equal the serial ones exactly,
+    and the model must come out unchanged.
+    """
+    model = PriceInferenceModel.from_artifact(f'models/{model_type}_model')
+    version, coef = model.version, model.coef.copy()
+    
+    rng = np.random.default_rng(seed)
+    requests = [
+        (date.today() + timedelta(days=int(offset)), int(days_ahead), float(demand))
+        for offset, days_ahead, demand in zip(
+            rng.integers(0, 60, n_requests), rng.integers(1, 31, n_requests), rng.uniform(80, 130, n_requests)
+        )
+    ]
+    
+    def serve(request, cache):
+        current_date, days_ahead, demand = request
+        forecast = cached_forecast(model, current_date, days_ahead, cache=cache, demand_score=demand)
+        rows = {
+            'date': [current_date + timedelta(days=offset) for offset in range(days_ahead)],
+            'demand_score': np.full(days_ahead, demand),
+            'advance_booking_days': np.full(days_ahead, 30)
+        }
+        return forecast, model.predict(rows)
+    
+    expected = [serve(request, ForecastCache()) for request in requests]
+    
+    shared_cache = ForecastCache()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        results = list(pool.map(lambda request: serve(request, shared_cache), requests))
+    elapsed = time.perf_counter() - start
+    
+    mismatches = sum(
+        got_forecast['current_price'] != want_forecast['current_price']
+        or got_forecast['future_dates'] != want_forecast['future_dates']
+        or not np.array_equal(got_forecast['future_prices'], want_forecast['future_prices'])
+        or got_forecast['recommendation'] != want_forecast['recommendation']
+        or not np.array_equal(got_prices, want_prices)
+        for (got_forecast, got_prices), (want_forecast, want_prices) in zip(results, expected)
+    )
+    unchanged = model.version == version and np.array_equal(model.coef, coef)
+    
+    print(f"\n🧵 {model_type.title()} concurrency stress: {n_requests} requests on {n_threads} threads "
+          f"in {elapsed * 1e3:.0f} ms, {mismatches} mismatches, model {'unchanged' if unchanged else 'MODIFIED'}")
+    assert mismatches == 0 and unchanged, "Concurrent inference diverged from serial results"
+
+def main():
+    """Run all benchmarks"""
+    if not os.path.exists('models/hotel_model.pkl') or not os.path.exists('models/flight_model.pkl'):
+        print("❌ Trained models not found. Please run model.py first.")
+        return
+
+    for model_type in ('hotel', 'flight'):
+        benchmark_inference(model_type)
+        benchmark_batch(model_type)
+        benchmark_fleet(model_type)
+        stress_concurrency(model_type)
+
+if __name__ == "__main__":
+    main()
@@ -5,153 +5,367 @@ Creates realistic sample datasets for hotel and flight prices
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from features import DAY_NAMES, SEASON_NAMES, MONTH_SEASON_CODES
 
-def generate_hotel_data():
-    """Generate realistic hotel price data with seasonal patterns"""
+# Default history span of the sample datasets
+START_DATE = '2022-01-01'
+END_DATE = '2024-12-31'
+
+# Output schemas, in CSV column order
+HOTEL_COLUMNS = ['date', 'hotel_id', 'price', 'day_of_week', 'month', 'is_weekend', 'season', 'demand_score']
+FLIGHT_COLUMNS = ['date', 'origin', 'destination', 'price', 'day_of_week', 'month', 'is_weekend', 'season',
+                  'advance_booking_days', 'demand_score']
+
+# Entity key columns: one hotel per hotel_id, one route per origin/destination pair
+ENTITY_COLUMNS = {
+    'hotel': ['hotel_id'],
+    'flight': ['origin', 'destination'],
+}
+
+# Hub airports used for routes, extended with synthetic codes for large fleets
+AIRPORTS = ['JFK', 'LAX', 'ORD', 'ATL', 'DFW', 'DEN', 'SFO', 'SEA', 'MIA', 'BOS',
+            'LAS', 'PHX', 'IAH', 'MCO', 'EWR', 'MSP', 'DTW', 'PHL', 'CLT', 'SLC',
+            'LHR', 'CDG', 'FRA', 'AMS', 'DXB', 'SIN', 'HND', 'SYD', 'YYZ', 'MEX']
+
+# Entity price levels come from a fixed catalogue seed so every shard,
+# chunk and data seed agrees on them
+ENTITY_SEED = 2024
+
+# Columnar formats supported for month-partitioned output (require pyarrow)
+PARTITION_FORMATS = ('parquet', 'feather')
+
+# Price factor tables indexed by weekday (Monday=0) or month (1-12, index 0 unused)
+
+# Hotel: winter peak, summer peak, shoulder season everywhere else
+HOTEL_SEASONAL_FACTORS = np.array([np.nan, 1.4, 1.4, 1.2, 1.2, 1.2, 1.6, 1.6, 1.6, 1.2, 1.2, 1.2, 1.4])
+
+# Flight: peak travel months (Dec, Jan, Jul, Aug), shoulder, off-peak (Apr-Jun)
+FLIGHT_SEASONAL_FACTORS = np.array([np.nan, 1.5, 1.2, 1.2, 0.9, 0.9, 0.9, 1.5, 1.5, 1.2, 1.2, 1.2, 1.5])
+
+# Flight: Tuesday/Wednesday cheaper, Friday/Sunday more expensive
+FLIGHT_DAY_FACTORS = np.array([1.0, 0.85, 0.85, 1.0, 1.3, 1.0, 1.3])
+
+def _calendar(scale, start_date, end_date, start_row=0, stop_row=None):
+    """Build row-aligned calendar arrays for rows [start_row, stop_row)
+
+    Rows are laid out date-major over `scale` entities: row k belongs to
+    date k // scale and entity k % scale, so any contiguous row range is
+    a valid slice of the full dataset.
+    """
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    if stop_row is None:
+        stop_row = len(dates) * scale
+    rows = np.arange(start_row, stop_row)
+    date_idx = rows // scale
+    month = dates.month.to_numpy().astype(np.int64)[date_idx]
+    day = dates.day.to_numpy()[date_idx]
+    weekday = dates.weekday.to_numpy()[date_idx]
+    return dates.to_numpy()[date_idx], month, day, weekday, rows % scale
+
+def entity_levels(scale):
+    """Relative price level of each entity; entity 0 is the reference at 1.0"""
+    levels = np.random.default_rng(ENTITY_SEED).lognormal(0, 0.2, scale)
+    levels[0] = 1.0
+    return levels
+
+def hotel_ids(scale):
+    """Hotel key vocabulary for `scale` hotels"""
+    return [f'H{i:05d}' for i in range(scale)]
+
+def routes(scale):
+    """Origin/destination airport codes for `scale` routes, plus the airport vocabulary.
+
+    Routes are enumerated so that the first k routes never depend on
+    `scale`: airport n adds the routes n->0, 0->n, n->1, 1->n, ...
+    """
+    n_airports = 2
+    while n_airports * (n_airports - 1) < scale:
+        n_airports += 1
+    airports = AIRPORTS + [f'X{i:02d}' for i in range(max(0, n_airports - len(AIRPORTS)))]
     
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    random.seed(42)
+    origin, destination = [], []
+    for new in range(1, n_airports):
+        for old in range(new):
+            origin += [new, old]
+            destination += [old, new]
+    return np.array(origin[:scale]), np.array(destination[:scale]), airports[:n_airports]
+
+def _base_columns(dates, month, weekday):
+    """Columns shared by the hotel and flight schemas"""
+    return {
+        'date': dates,
+        'day_of_week': pd.Categorical.from_codes(weekday, DAY_NAMES),
+        'month': month.astype(np.int8),
+        'is_weekend': (weekday >= 5).astype(np.int8),
+        'season': pd.Categorical.from_codes(MONTH_SEASON_CODES[month], SEASON_NAMES),
+    }
+
+def _hotel_rows(scale, dates, month, day, weekday, entity, rng):
+    """Simulate hotel prices for the given calendar rows"""
     
-    # Generate dates for 2 years of data
-    start_date = datetime(2022, 1, 1)
-    end_date = datetime(2024, 12, 31)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    n_rows = len(dates)
     
-    hotel_data = []
-    
-    for date in dates:
-        # Base price with seasonal variation
-        base_price = 100
-        
-        # Seasonal factors
-        month = date.month
-        if month in [12, 1, 2]:  # Winter peak
-            seasonal_factor = 1.4
-        elif month in [6, 7, 8]:  # Summer peak
-            seasonal_factor = 1.6
-        elif month in [3, 4, 5, 9, 10, 11]:  # Shoulder season
-            seasonal_factor = 1.2
-        
-        # Weekend premium
-        weekend_factor = 1.3 if date.weekday() >= 5 else 1.0
-        
-        # Holiday premium (simplified)
-        holiday_factor = 1.5 if date.day == 25 and date.month == 12 else 1.0
-        
-        # Random demand factor
-        demand_factor = np.random.uniform(0.8, 1.2)
-        
-        # Calculate final price
-        price = base_price * seasonal_factor * weekend_factor * holiday_factor * demand_factor
-        
-        # Add some noise
-        price += np.random.normal(0, 10)
-        price = max(50, round(price, 2))  # Minimum price of $50
-        
-        hotel_data.append({
-            'date': date,
-            'price': price,
-            'day_of_week': date.strftime('%A'),
-            'month': date.month,
-            'is_weekend': 1 if date.weekday() >= 5 else 0,
-            'season': get_season(date.month),
-            'demand_score': round(demand_factor * 100, 1)
-        })
-    
-    return pd.DataFrame(hotel_data)
-
-def generate_flight_data():
-    """Generate realistic flight price data with booking patterns"""
-    
-    np.random.seed(42)
-    random.seed(42)
-    
-    # Generate dates for 2 years
-    start_date = datetime(2022, 1, 1)
-    end_date = datetime(2024, 12, 31)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    # Base price per hotel with seasonal, weekend and holiday (Christmas) premiums
+    base_price = 100 * entity_levels(scale)[entity]
+    seasonal_factor = HOTEL_SEASONAL_FACTORS[month]
+    weekend_factor = np.where(weekday >= 5, 1.3, 1.0)
+    holiday_factor = np.where((month == 12) & (day == 25), 1.5, 1.0)
+    
+    # Random demand factor and noise, one draw per column
+    demand_factor = rng.uniform(0.8, 1.2, n_rows)
+    noise = rng.normal(0, 10, n_rows)
+    
+    price = base_price * seasonal_factor * weekend_factor * holiday_factor * demand_factor + noise
+    price = np.maximum(50, np.round(price, 2))  # Minimum price of $50
+    
+    hotel_data = _base_columns(dates, month, weekday)
+    hotel_data['hotel_id'] = pd.Categorical.from_codes(entity, hotel_ids(scale))
+    hotel_data['price'] = price
+    hotel_data['demand_score'] = np.round(demand_factor * 100, 1)
+    
+    return pd.DataFrame(hotel_data, columns=HOTEL_COLUMNS)
+
+def _flight_rows(scale, dates, month, day, weekday, entity, rng):
+    """Simulate flight prices for the given calendar rows"""
+    
+    n_rows = len(dates)
+    
+    # Base price per route with seasonal and day-of-week factors
+    base_price = 300 * entity_levels(scale)[entity]
+    seasonal_factor = FLIGHT_SEASONAL_FACTORS[month]
+    day_factor = FLIGHT_DAY_FACTORS[weekday]
+    
+    # Advance booking and market factors, noise and booking window
+    advance_factor = rng.uniform(0.7, 1.4, n_rows)
+    market_factor = rng.uniform(0.9, 1.1, n_rows)
+    noise = rng.normal(0, 20, n_rows)
+    advance_booking_days = rng.integers(1, 91, n_rows)
+    
+    price = base_price * seasonal_factor * day_factor * advance_factor * market_factor + noise
+    price = np.maximum(150, np.round(price, 2))  # Minimum price of $150
+    
+    flight_data = _base_columns(dates, month, weekday)
+    origin, destination, airports = routes(scale)
+    flight_data['origin'] = pd.Categorical.from_codes(origin[entity], airports)
+    flight_data['destination'] = pd.Categorical.from_codes(destination[entity], airports)
+    flight_data['price'] = price
+    flight_data['advance_booking_days'] = advance_booking_days.astype(np.int16)
+    flight_data['demand_score'] = np.round(market_factor * 100, 1)
+    
+    return pd.DataFrame(flight_data, columns=FLIGHT_COLUMNS)
+
+ROW_GENERATORS = {
+    'hotel': _hotel_rows,
+    'flight': _flight_rows,
+}
+
+def generate_rows(service, scale=1, start_date=START_DATE, end_date=END_DATE,
+                  start_row=0, stop_row=None, seed=42):
+    """Generate rows [start_row, stop_row) of a `service` dataset.
+
+    `seed` may be an int or a `np.random.SeedSequence`.
+    """
+    rng = np.random.default_rng(seed)
+    calendar = _calendar(scale, start_date, end_date, start_row, stop_row)
+    return ROW_GENERATORS[service](scale, *calendar, rng)
+
+def generate_hotel_data(scale=1, start_date=START_DATE, end_date=END_DATE, seed=42):
+    """Generate realistic hotel price data with seasonal patterns
+
+    `scale` is the number of hotels to simulate; the date span is set by
+    `start_date`/`end_date`. Every factor is computed from array masks and
+    each random column is drawn in a single call, so the cost is a handful
+    of NumPy passes regardless of the number of rows.
+    """
+    return generate_rows('hotel', scale, start_date, end_date, seed=seed)
+
+def generate_flight_data(scale=1, start_date=START_DATE, end_date=END_DATE, seed=42):
+    """Generate realistic flight price data with booking patterns
+
+    `scale` is the number of routes to simulate; see `generate_hotel_data`.
+    """
+    return generate_rows('flight', scale, start_date, end_date, seed=seed)
+
+def count_rows(scale=1, start_date=START_DATE, end_date=END_DATE):
+    """Total number of rows in a dataset of `scale` entities over the date span"""
+    return len(pd.date_range(start=start_date, end=end_date, freq='D')) * scale
+
+def plan_shards(n_rows, shard_rows, seed=42):
+    """Split [0, n_rows) into fixed-size shards, each with its own seed.
+
+    Shard boundaries depend only on `shard_rows` and each shard's seed is
+    spawned from `SeedSequence(seed)` by shard index, so the generated
+    data is identical whichever worker ends up running a shard.
+    """
+    n_shards = max(1, -(-n_rows // shard_rows))
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    return [
+        (i, i * shard_rows, min((i + 1) * shard_rows, n_rows), seeds[i])
+        for i in range(n_shards)
+    ]
+
+def iter_chunks(service, scale=1, start_date=START_DATE, end_date=END_DATE,
+                chunk_rows=1_000_000, seed=42):
+    """Yield a `service` dataset as typed DataFrames of at most `chunk_rows` rows.
+
+    Only one chunk is alive at a time, so peak memory does not grow with
+    the total number of rows. Chunks match the shards of
+    `generate_sharded` for the same `chunk_rows` and `seed`.
+    """
+    for _, start_row, stop_row, chunk_seed in plan_shards(
+        count_rows(scale, start_date, end_date), chunk_rows, seed
+    ):
+        yield generate_rows(service, scale, start_date, end_date, start_row, stop_row, chunk_seed)
+
+def write_partitioned(chunk, out_dir, part, fmt='parquet'):
+    """Write one chunk into month partitions: <out_dir>/year_month=YYYY-MM/part-NNNNN.<fmt>
+
+    Rows are date-major, so each month is a contiguous slice of the chunk.
+    Returns the list of written paths.
+    """
+    if fmt not in PARTITION_FORMATS:
+        raise ValueError(f"Unsupported partition format: {fmt}")
     
-    flight_data = []
-    
-    for date in dates:
-        # Base price
-        base_price = 300
-        
-        # Seasonal factors
-        month = date.month
-        if month in [12, 1, 7, 8]:  # Peak travel months
-            seasonal_factor = 1.5
-        elif month in [2, 3, 9, 10, 11]:  # Shoulder season
-            seasonal_factor = 1.2
-        else:  # Off-peak
-            seasonal_factor = 0.9
-        
-        # Day of week factor (Tuesday/Wednesday cheaper)
-        day_of_week = date.weekday()
-        if day_of_week in [1, 2]:  # Tuesday, Wednesday
-            day_factor = 0.85
-        elif day_of_week in [4, 6]:  # Friday, Sunday
-            day_factor = 1.3
+    months = chunk['date'].to_numpy().astype('datetime64[M]')
+    bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(chunk)]])
+    
+    paths = []
+    for start, stop in zip(starts, stops):
+        partition_dir = os.path.join(out_dir, f'year_month={months[start]}')
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, f'part-{part:05d}.{fmt}')
+        month_df = chunk.iloc[start:stop].reset_index(drop=True)
+        if fmt == 'parquet':
+            month_df.to_parquet(path, index=False)
         else:
-            day_factor = 1.0
-        
-        # Advance booking factor (simplified)
-        advance_factor = np.random.uniform(0.7, 1.4)
-        
-        # Random market factor
-        market_factor = np.random.uniform(0.9, 1.1)
-        
-        # Calculate final price
-        price = base_price * seasonal_factor * day_factor * advance_factor * market_factor
-        
-        # Add noise
-        price += np.random.normal(0, 20)
-        price = max(150, round(price, 2))  # Minimum price of $150
-        
-        flight_data.append({
-            'date': date,
-            'price': price,
-            'day_of_week': date.strftime('%A'),
-            'month': date.month,
-            'is_weekend': 1 if date.weekday() >= 5 else 0,
-            'season': get_season(date.month),
-            'advance_booking_days': random.randint(1, 90),
-            'demand_score': round(market_factor * 100, 1)
-        })
-    
-    return pd.DataFrame(flight_data)
-
-def get_season(month):
-    """Convert month to season"""
-    if month in [12, 1, 2]:
-        return 'Winter'
-    elif month in [3, 4, 5]:
-        return 'Spring'
-    elif month in [6, 7, 8]:
-        return 'Summer'
+            month_df.to_feather(path)
+        paths.append(path)
+    return paths
+
+def stream_to_partitions(service, scale=1, start_date=START_DATE, end_date=END_DATE,
+                         out_dir='data/partitions', chunk_rows=1_000_000, fmt='parquet', seed=42):
+    """Stream a generated dataset chunk by chunk into month-partitioned files"""
+    service_dir = os.path.join(out_dir, f'{service}_prices')
+    paths = []
+    for part, chunk in enumerate(iter_chunks(service, scale, start_date, end_date, chunk_rows, seed)):
+        paths.extend(write_partitioned(chunk, service_dir, part, fmt))
+    return paths
+
+def _write_shard(service, scale, start_date, end_date, out_dir, fmt, shard):
+    """Generate one shard and write it to a CSV file or to month partitions"""
+    index, start_row, stop_row, seed = shard
+    shard_df = generate_rows(service, scale, start_date, end_date, start_row, stop_row, seed)
+    if fmt == 'csv':
+        path = os.path.join(out_dir, f'{service}_prices_{index:05d}.csv')
+        shard_df.to_csv(path, index=False)
+        return [path]
+    return write_partitioned(shard_df, os.path.join(out_dir, f'{service}_prices'), index, fmt)
+
+def generate_sharded(service, scale=1, start_date=START_DATE, end_date=END_DATE,
+                     out_dir='data/shards', shard_rows=1_000_000, n_workers=None,
+                     fmt='csv', seed=42):
+    """Generate a large dataset across a process pool, one output file per shard.
+
+    With `fmt='csv'` each shard is one flat file; with 'parquet' or
+    'feather' each shard writes its own part into the month partitions.
+    Output is bit-for-bit reproducible for a given `seed` and `shard_rows`,
+    regardless of `n_workers`. Returns the list of written paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    shards = plan_shards(count_rows(scale, start_date, end_date), shard_rows, seed)
+    write = partial(_write_shard, service, scale, start_date, end_date, out_dir, fmt)
+    
+    if n_workers == 1:
+        results = [write(shard) for shard in shards]
     else:
-        return 'Fall'
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(write, shards))
+    
+    return [path for paths in results for path in paths]
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate sample hotel and flight price datasets")
+    parser.add_argument('--scale', type=int, default=1, help="number of hotels/routes to simulate")
+    parser.add_argument('--start-date', default=START_DATE)
+    parser.add_argument('--end-date', default=END_DATE)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sharded', action='store_true',
+                        help="generate in parallel shards, one file per shard")
+    parser.add_argument('--stream', action='store_true',
+                        help="stream chunks into month-partitioned columnar files")
+    parser.add_argument('--format', choices=('csv',) + PARTITION_FORMATS, default=None,
+                        help="output format for --sharded (default csv) or --stream (default parquet)")
+    parser.add_argument('--chunk-rows', '--shard-rows', dest='chunk_rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument('--out-dir', default=None)
+    return parser.parse_args(argv)
 
-def main():
+def main_sharded(args):
+    """Generate sharded benchmark datasets"""
+    fmt = args.format or 'csv'
+    out_dir = args.out_dir or 'data/shards'
+    n_rows = count_rows(args.scale, args.start_date, args.end_date)
+    print(f"🔄 Generating {n_rows:,} rows per service in shards of {args.chunk_rows:,}...")
+    
+    for service in ROW_GENERATORS:
+        paths = generate_sharded(
+            service, args.scale, args.start_date, args.end_date,
+            out_dir=out_dir, shard_rows=args.chunk_rows,
+            n_workers=args.workers, fmt=fmt, seed=args.seed
+        )
+        print(f"✅ {service.title()} dataset created: {len(paths)} files in {out_dir}")
+    
+    print("\n🎉 Data generation completed successfully!")
+
+def main_stream(args):
+    """Stream datasets into month-partitioned columnar files"""
+    fmt = args.format or 'parquet'
+    if fmt == 'csv':
+        raise SystemExit("--stream writes columnar partitions; use --format parquet or feather")
+    out_dir = args.out_dir or 'data/partitions'
+    n_rows = count_rows(args.scale, args.start_date, args.end_date)
+    print(f"🔄 Streaming {n_rows:,} rows per service in chunks of {args.chunk_rows:,}...")
+    
+    for service in ROW_GENERATORS:
+        paths = stream_to_partitions(
+            service, args.scale, args.start_date, args.end_date,
+            out_dir=out_dir, chunk_rows=args.chunk_rows, fmt=fmt, seed=args.seed
+        )
+        print(f"✅ {service.title()} dataset created: {len(paths)} {fmt} files in {out_dir}")
+    
+    print("\n🎉 Data generation completed successfully!")
+
+def main(argv=None):
     """Generate and save datasets"""
+    args = parse_args(argv)
+    if args.sharded:
+        main_sharded(args)
+        return
+    if args.stream:
+        main_stream(args)
+        return
+    
     print("🔄 Generating sample datasets...")
     
     # Create data directory
-    import os
     os.makedirs('data', exist_ok=True)
     
     # Generate hotel data
     print("📊 Creating hotel price dataset...")
-    hotel_df = generate_hotel_data()
+    hotel_df = generate_hotel_data(args.scale, args.start_date, args.end_date, args.seed)
     hotel_df.to_csv('data/hotel_prices.csv', index=False)
     print(f"✅ Hotel dataset created: {len(hotel_df)} records")
     
     # Generate flight data
     print("✈️ Creating flight price dataset...")
-    flight_df = generate_flight_data()
+    flight_df = generate_flight_data(args.scale, args.start_date, args.end_date, args.seed)
     flight_df.to_csv('data/flight_prices.csv', index=False)
     print(f"✅ Flight dataset created: {len(flight_df)} records")
     
@@ -0,0 +1,465 @@
+"""
+AI-Driven Price Forecasting System - Data Store
+Price histories with change-driven reloads, backed by a typed columnar (Arrow IPC) cache
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from features import date_ordinals
+from analytics import PriceCube, entity_codes
+
+# Where converted price histories are kept: a JSON manifest plus Arrow segments per source
+CACHE_DIR = 'data/cache'
+
+# Repeated string columns are stored as categoricals (int codes + one copy of each label)
+CATEGORY_COLUMNS = ['day_of_week', 'season', 'hotel_id', 'origin', 'destination']
+
+# Compact in-memory dtype of each known numeric column. Floats are parsed
+# straight into float32 (prices and demand scores need ~7 significant
+# digits at most); integers are narrowed only when every value fits
+PRICE_SCHEMA = {
+    'price': 'float32',
+    'demand_score': 'float32',
+    'month': 'int8',
+    'is_weekend': 'int8',
+    'advance_booking_days': 'int16',
+}
+
+# Bumped whenever PRICE_SCHEMA changes, so older cached segments are rebuilt
+SCHEMA_VERSION = 1
+
+# Bytes hashed at the start of a source, and just before its last loaded end,
+# to tell an append from a rewrite
+CHECK_BYTES = 64 * 1024
+
+# Appended segments kept on disk before they are compacted into one file
+MAX_SEGMENTS = 8
+
+def read_prices_csv(source, names=None):
+    """Read price history CSV text into the compact schema (see PRICE_SCHEMA)
+
+    `source` is a path or file object; pass `names` to read headerless rows
+    (an appended tail) with the columns of the original file.
+    """
+    dtypes = {col: 'category' for col in CATEGORY_COLUMNS}
+    dtypes.update({col: dtype for col, dtype in PRICE_SCHEMA.items() if dtype.startswith('float')})
+    df = pd.read_csv(
+        source,
+        header=None if names is not None else 'infer',
+        names=names,
+        parse_dates=['date'],
+        dtype=dtypes
+    )
+    return narrow_integers(df)
+
+def narrow_integers(df):
+    """Cast integer columns to their PRICE_SCHEMA dtype where every value fits (in place)"""
+    for col, dtype in PRICE_SCHEMA.items():
+        if col not in df.columns or not dtype.startswith('int') or not pd.api.types.is_integer_dtype(df[col]):
+            continue
+        limits = np.iinfo(dtype)
+        values = df[col].to_numpy()
+        if not len(values) or (values.min() >= limits.min and values.max() <= limits.max):
+            df[col] = values.astype(dtype)
+    return df
+
+def memory_report(df, baseline=None):
+    """Bytes used by each column of `df` (deep), optionally next to a `baseline` frame"""
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': df.memory_usage(deep=True, index=False)
+    })
+    if baseline is not None:
+        report['baseline_dtype'] = baseline.dtypes.astype(str)
+        report['baseline_bytes'] = baseline.memory_usage(deep=True, index=False)
+        report['ratio'] = report['bytes'] / report['baseline_bytes']
+    report.loc['total'] = report.sum(numeric_only=True)
+    if baseline is not None:
+        report.loc['total', 'ratio'] = report.loc['total', 'bytes'] / report.loc['total', 'baseline_bytes']
+    return report
+
+def concat_prices(frames):
+    """Concatenate price frames, keeping categorical columns categorical
+
+    Categories missing from the first frame are appended to its category
+    list, so existing codes stay valid.
+    """
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+
+    first, rest = frames[0], frames[1:]
+    categories = {}
+    for col in first.columns:
+        if isinstance(first[col].dtype, pd.CategoricalDtype):
+            merged = first[col].cat.categories
+            for frame in rest:
+                merged = merged.append(frame[col].cat.categories.difference(merged))
+            categories[col] = merged
+
+    aligned = []
+    for frame in frames:
+        if categories:
+            frame = frame.assign(**{col: frame[col].cat.set_categories(values) for col, values in categories.items()})
+        aligned.append(frame)
+    return pd.concat(aligned, ignore_index=True)
+
+def file_digest(path, start=0, stop=None):
+    """sha1 of the bytes of `path` in [start, stop) (to the end when `stop` is None)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = None if stop is None else stop - start
+        while remaining is None or remaining > 0:
+            block = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+def write_columnar(df, path):
+    """Write `df` as an uncompressed Feather v2 (Arrow IPC) file, atomically"""
+    from pyarrow import feather
+
+    staging = f'{path}.{os.getpid()}.tmp'
+    feather.write_feather(df, staging, compression='uncompressed')
+    os.replace(staging, path)
+
+def read_columnar(path):
+    """Memory-map a Feather v2 file back into a DataFrame (categoricals and dates preserved)"""
+    from pyarrow import feather
+
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+def row_positions(values, n_rows):
+    """Row numbers as int32 while they fit (halving the index), else int64"""
+    return np.asarray(values, dtype=np.int32 if n_rows < 2 ** 31 else np.int64)
+
+class PriceIndex:
+    """Binary-search range queries over a price history in (entity, date) order
+
+    The history frame itself is left as loaded. The index keeps the row
+    permutation that puts it in entity-then-date order, the day ordinal of
+    each row in that order and where each entity's rows start. Queries
+    find their rows with `searchsorted` and gather only those rows, so a
+    view costs the same however long the history grows. When the frame is
+    already in index order (e.g. a single hotel or route), no permutation
+    is kept and views are plain `iloc` slices that share its memory.
+    Treat the views as read-only.
+
+    `extended` merges appended rows into a new index without re-sorting.
+
+    Entities are coded as by `entity_codes` (distinct combinations of
+    `entity_columns`, e.g. hotel_id or origin and destination), with
+    entities first seen in appended rows coded after the existing ones.
+    Passing `entity=None` means every row, which range queries only allow
+    when there is a single entity.
+    """
+
+    def __init__(self, frame, entity_columns, labels, bounds, days, order):
+        self.frame = frame
+        self.entity_columns = tuple(entity_columns)
+        self.labels = labels
+        self.bounds = bounds
+        self.days = days
+        self.order = order
+
+    @classmethod
+    def from_frame(cls, frame, entity_columns=()):
+        """Index every row of a price frame"""
+        codes, labels = entity_codes(frame, entity_columns)
+        days = date_ordinals(frame['date'])
+        order = np.lexsort((days, codes))
+        in_order = np.array_equal(order, np.arange(len(order)))
+        return cls(
+            frame, entity_columns, labels,
+            np.searchsorted(codes[order], np.arange(len(labels) + 1)),
+            days[order].astype(np.int32),
+            None if in_order else row_positions(order, len(order))
+        )
+
+    def extended(self, frame):
+        """Index of `frame`, whose rows past this index's are newly appended ones
+
+        Each appended row is placed after the rows of its entity dated on
+        or before it, with one insert into the ordering arrays.
+        """
+        start = len(self.days)
+        codes, labels = entity_codes(frame.iloc[start:], self.entity_columns)
+        if not len(codes):
+            return PriceIndex(frame, self.entity_columns, self.labels, self.bounds, self.days, self.order)
+
+        positions = {label: code for code, label in enumerate(self.labels)}
+        new_labels = [label for label in labels if label not in positions]
+        positions.update((label, len(self.labels) + i) for i, label in enumerate(new_labels))
+        codes = np.array([positions[label] for label in labels], dtype=np.int64)[codes]
+        days = date_ordinals(frame['date'].iloc[start:])
+        tail_order = np.lexsort((days, codes))
+        codes, days = codes[tail_order], days[tail_order]
+
+        # Entities first seen in the tail start (empty) at the end of the index
+        n_entities = len(self.labels) + len(new_labels)
+        bounds = np.append(self.bounds, np.full(len(new_labels), self.bounds[-1]))
+        at = np.empty(len(codes), dtype=np.int64)
+        tail_bounds = np.searchsorted(codes, np.arange(n_entities + 1))
+        for code in np.unique(codes):
+            lo, hi = bounds[code], bounds[code + 1]
+            first, last = tail_bounds[code], tail_bounds[code + 1]
+            at[first:last] = lo + np.searchsorted(self.days[lo:hi], days[first:last], side='right')
+
+        rows = start + tail_order
+        if self.order is None and np.all(at == start) and np.array_equal(tail_order, np.arange(len(codes))):
+            order = None
+        else:
+            order = np.arange(start) if self.order is None else self.order
+            order = row_positions(np.insert(order, at, rows), len(frame))
+        return PriceIndex(
+            frame, self.entity_columns, self.labels + new_labels, bounds + tail_bounds,
+            np.insert(self.days, at, days.astype(np.int32)), order
+        )
+
+    def __len__(self):
+        return len(self.days)
+
+    def entities(self):
+        """Display label of each entity code"""
+        return dict(enumerate(self.labels))
+
+    def _span(self, entity, ranged=False):
+        """[lo, hi) positions of `entity` in index order (all rows when None)"""
+        if entity is None:
+            if ranged and len(self.labels) > 1:
+                raise ValueError("Date ranges need an entity when the history holds several")
+            return 0, len(self.days)
+        return int(self.bounds[entity]), int(self.bounds[entity + 1])
+
+    def _take(self, lo, hi):
+        """Rows at index positions [lo, hi)"""
+        if self.order is None:
+            return self.frame.iloc[lo:hi]
+        return self.frame.take(self.order[lo:hi])
+
+    def rows(self, entity=None):
+        """Every row of `entity`, in date order"""
+        return self._take(*self._span(entity))
+
+    def between(self, start, end, entity=None):
+        """Rows of `entity` dated from `start` to `end`, both inclusive"""
+        lo, hi = self._span(entity, ranged=True)
+        days = self.days[lo:hi]
+        first = lo + np.searchsorted(days, date_ordinals(start), side='left')
+        last = lo + np.searchsorted(days, date_ordinals(end), side='right')
+        return self._take(first, last)
+
+    def last_days(self, n_days, entity=None):
+        """Rows of `entity` in the `n_days` days up to its latest date"""
+        lo, hi = self._span(entity, ranged=True)
+        if lo == hi:
+            return self._take(lo, hi)
+        first = lo + np.searchsorted(self.days[lo:hi], self.days[hi - 1] - n_days + 1, side='left')
+        return self._take(first, hi)
+
+class PriceHistory:
+    """One price history source, reloaded only as far as it changed on disk
+
+    Every `load` stats the source. An unchanged size and mtime returns the
+    frame already in memory. Growth that keeps the start of the file and
+    the bytes before the previous end intact is treated as an append: only
+    the new complete lines are parsed and added, and they are saved as one
+    more Arrow segment. Any other change (shrinking, rewrites, an mtime
+    change with different content) rebuilds from the CSV. The manifest and
+    segments under `cache_dir` let a fresh process start from the cache,
+    and a missing pyarrow just disables that persistence. `views` serves
+    the same data as a PriceIndex and a PriceCube over `entity_columns`;
+    appended rows are merged into both instead of rebuilding them.
+    """
+
+    def __init__(self, path, cache_dir=CACHE_DIR, entity_columns=()):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.entity_columns = tuple(entity_columns)
+        self.stem = os.path.splitext(os.path.basename(path))[0]
+        self.manifest_path = os.path.join(cache_dir, f'{self.stem}.json')
+        self.persist = importlib.util.find_spec('pyarrow') is not None
+        self.frame = None
+        self.state = None
+        self.reloads = {'unchanged': 0, 'touched': 0, 'append': 0, 'rebuild': 0}
+        self._index = None
+        self._cube = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Current contents of the source as a DataFrame (shared; do not modify it in place)"""
+        with self._lock:
+            if self.frame is None:
+                self._restore()
+
+            stat = os.stat(self.path)
+            change = self._classify(stat)
+            if change == 'touched':
+                self.state['mtime_ns'] = stat.st_mtime_ns
+                self._save_manifest()
+            elif change == 'append':
+                self._append(stat)
+            elif change == 'rebuild':
+                self._rebuild(stat)
+
+            self.reloads[change] += 1
+            return self.frame
+
+    def views(self):
+        """PriceIndex and PriceCube of the current contents, both from one load"""
+        frame = self.load()
+        with self._lock:
+            if self._index is None or self._index[0] is not frame:
+                self._index = (frame, PriceIndex.from_frame(frame, self.entity_columns))
+            if self._cube is None or self._cube[0] is not frame:
+                self._cube = (frame, PriceCube.from_frame(frame, self.entity_columns))
+            return self._index[1], self._cube[1]
+
+    def _classify(self, stat):
+        """How the source changed since it was last loaded"""
+        state = self.state
+        if self.frame is None or state is None:
+            return 'rebuild'
+        if stat.st_size == state['size'] and stat.st_mtime_ns == state['mtime_ns']:
+            return 'unchanged'
+        if stat.st_size < state['size'] or not state['ends_with_newline']:
+            return 'rebuild'
+
+        # Content before the previous end must be untouched for an append
+        if file_digest(self.path, 0, min(CHECK_BYTES, state['size'])) != state['head_digest']:
+            return 'rebuild'
+        if file_digest(self.path, max(0, state['size'] - CHECK_BYTES), state['size']) != state['end_digest']:
+            return 'rebuild'
+
+        if stat.st_size > state['size']:
+            return 'append'
+        # Same size, new mtime: only a full content check can prove nothing changed
+        if state['content_digest'] is not None and file_digest(self.path) == state['content_digest']:
+            return 'touched'
+        return 'rebuild'
+
+    def _rebuild(self, stat):
+        """Parse the whole source and replace the cache with one segment"""
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        self.frame = read_prices_csv(io.BytesIO(raw))
+        self.state = {
+            'size': len(raw),
+            'mtime_ns': stat.st_mtime_ns,
+            'columns': list(self.frame.columns),
+            'ends_with_newline': raw.endswith(b'\n'),
+            'head_digest': hashlib.sha1(raw[:CHECK_BYTES]).hexdigest(),
+            'end_digest': hashlib.sha1(raw[max(0, len(raw) - CHECK_BYTES):]).hexdigest(),
+            'content_digest': hashlib.sha1(raw).hexdigest(),
+            'schema_version': SCHEMA_VERSION,
+            'segments': []
+        }
+        self._replace_segments(self.frame)
+
+    def _append(self, stat):
+        """Parse and add the complete lines written after the previously loaded end"""
+        state = self.state
+        with open(self.path, 'rb') as f:
+            f.seek(state['size'])
+            raw = f.read(stat.st_size - state['size'])
+
+        # A line still being written is picked up on a later load
+        complete = raw.rfind(b'\n') + 1
+        if not complete:
+            return
+
+        tail = read_prices_csv(io.BytesIO(raw[:complete]), names=state['columns'])
+        previous, self.frame = self.frame, concat_prices([self.frame, tail])
+        if self._cube is not None and self._cube[0] is previous:
+            # Fold the new rows into the cube instead of re-aggregating everything
+            self._cube[1].add(tail)
+            self._cube = (self.frame, self._cube[1])
+        if self._index is not None and self._index[0] is previous:
+            self._index = (self.frame, self._index[1].extended(self.frame))
+
+        state['size'] += complete
+        state['mtime_ns'] = stat.st_mtime_ns if complete == len(raw) else None
+        state['head_digest'] = file_digest(self.path, 0, min(CHECK_BYTES, state['size']))
+        state['end_digest'] = file_digest(self.path, max(0, state['size'] - CHECK_BYTES), state['size'])
+        state['content_digest'] = None
+
+        if not self.persist:
+            return
+        if len(state['segments']) >= MAX_SEGMENTS:
+            self._replace_segments(self.frame)
+        else:
+            state['segments'].append(self._write_segment(tail))
+            self._save_manifest()
+
+    def _write_segment(self, frame):
+        name = f'{self.stem}-{os.getpid()}-{time.time_ns()}.arrow'
+        write_columnar(frame, os.path.join(self.cache_dir, name))
+        return name
+
+    def _replace_segments(self, frame):
+        """Persist `frame` as the only segment and delete every other segment of this source"""
+        if not self.persist:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.state['segments'] = [self._write_segment(frame)]
+        self._save_manifest()
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(f'{self.stem}-') and name.endswith('.arrow') and name not in self.state['segments']:
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def _save_manifest(self):
+        if not self.persist:
+            return
+        staging = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(staging, 'w') as f:
+            json.dump(dict(self.state, source=os.path.abspath(self.path)), f)
+        os.replace(staging, self.manifest_path)
+
+    def _restore(self):
+        """Start from the cached segments of a previous process, if they are intact"""
+        if not self.persist or not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path) as f:
+                state = json.load(f)
+            if state.pop('source') != os.path.abspath(self.path) or state.get('schema_version') != SCHEMA_VERSION:
+                return
+            frames = [read_columnar(os.path.join(self.cache_dir, name)) for name in state['segments']]
+        except (OSError, ValueError, KeyError):
+            # Torn or concurrently compacted cache: rebuild from the source
+            return
+        if frames:
+            self.frame = concat_prices(frames)
+            self.state = state
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Per-column memory of price histories: plain read_csv vs compact schema")
+    parser.add_argument('paths', nargs='*', default=['data/hotel_prices.csv', 'data/flight_prices.csv'])
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Print a memory report for each price history"""
+    args = parse_args(argv)
+    
+    for path in args.paths:
+        report = memory_report(read_prices_csv(path), pd.read_csv(path, parse_dates=['date']))
+        total = report.loc['total']
+        print(f"\n🧮 {path}: {total['bytes'] / 1e6:.1f} MB vs {total['baseline_bytes'] / 1e6:.1f} MB "
+              f"({total['ratio']:.0%})")
+        print(report.to_string(float_format=lambda value: f'{value:,.2f}'))
+
+if __name__ == "__main__":
+    main()
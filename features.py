@@ -0,0 +1,112 @@
+"""
+AI-Driven Price Forecasting System - Calendar Features
+Precomputed date feature table shared by data generation, training and inference
+"""
+
+import numpy as np
+
+# Closed vocabularies of the categorical columns
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SEASON_NAMES = ['Spring', 'Summer', 'Fall', 'Winter']
+
+# Code given to values outside a vocabulary (same convention as pandas Categorical)
+UNKNOWN_CODE = -1
+
+# Season code (index into SEASON_NAMES) by month, index 0 unused
+MONTH_SEASON_CODES = np.array([-1, 3, 3, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3], dtype=np.int8)
+
+# Expected demand score: baseline plus weekend and peak-season (Jun-Aug, Dec) boosts
+BASE_DEMAND = 100
+WEEKEND_DEMAND_BOOST = 10
+PEAK_SEASON_DEMAND_BOOST = 15
+PEAK_DEMAND_MONTHS = [6, 7, 8, 12]
+
+# Span covered by the calendar table
+CALENDAR_START = np.datetime64('1990-01-01', 'D')
+CALENDAR_END = np.datetime64('2100-12-31', 'D')
+
+def _iso_weeks_in_year(year):
+    """Number of ISO weeks (52 or 53) in each year"""
+    def p(y):
+        return (y + y // 4 - y // 100 + y // 400) % 7
+    return np.where((p(year) == 4) | (p(year - 1) == 3), 53, 52)
+
+def build_calendar(start=CALENDAR_START, end=CALENDAR_END):
+    """Build the date feature table for every day in [start, end].
+
+    Returns a dict of column name -> array with one entry per day, where
+    entry i describes the day `start + i`. Weekday is Monday=0 and season
+    is an index into SEASON_NAMES.
+    """
+    days = np.arange(start, end + np.timedelta64(1, 'D'))
+    years = days.astype('datetime64[Y]')
+    months = days.astype('datetime64[M]')
+
+    year = years.astype(np.int64) + 1970
+    month = (months - years.astype('datetime64[M]')).astype(np.int64) + 1
+    day = (days - months.astype('datetime64[D]')).astype(np.int64) + 1
+    day_of_year = (days - years.astype('datetime64[D]')).astype(np.int64) + 1
+
+    # 1970-01-01 was a Thursday
+    weekday = (days.astype(np.int64) + 3) % 7
+
+    # ISO 8601 week number, rolling over into the previous/next ISO year
+    week = (day_of_year - (weekday + 1) + 10) // 7
+    week_of_year = np.where(week < 1, _iso_weeks_in_year(year - 1), week)
+    week_of_year = np.where(week > _iso_weeks_in_year(year), 1, week_of_year)
+
+    calendar = {
+        'year': year,
+        'month': month,
+        'day': day,
+        'day_of_year': day_of_year,
+        'week_of_year': week_of_year,
+        'weekday': weekday,
+        'is_weekend': (weekday >= 5).astype(np.int64),
+        'season': MONTH_SEASON_CODES[month].astype(np.int64),
+    }
+    for values in calendar.values():
+        values.flags.writeable = False
+    return calendar
+
+CALENDAR = build_calendar()
+
+def date_ordinals(dates):
+    """Convert dates (datetime64 array, DatetimeIndex, Series, date objects or strings) to day numbers"""
+    if hasattr(dates, 'to_numpy'):
+        dates = dates.to_numpy()
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+def calendar_rows(dates):
+    """Row index of each date in CALENDAR"""
+    rows = np.atleast_1d(date_ordinals(dates)) - CALENDAR_START.astype(np.int64)
+    if rows.size and (rows.min() < 0 or rows.max() >= len(CALENDAR['year'])):
+        raise ValueError(f"Dates must fall between {CALENDAR_START} and {CALENDAR_END}")
+    return rows
+
+def vocabulary_codes(names, vocabulary):
+    """Position of each name in `vocabulary`, UNKNOWN_CODE where it is missing
+    
+    Names are binary-searched in the sorted vocabulary and kept where the
+    value found there is the name itself.
+    """
+    names = np.asarray(names)
+    vocabulary = np.asarray(vocabulary)
+    if not len(vocabulary):
+        return np.full(names.shape, UNKNOWN_CODE, dtype=np.int64)
+    if 'O' in (names.dtype.kind, vocabulary.dtype.kind) or names.dtype.kind != vocabulary.dtype.kind:
+        # Mixed or object values (e.g. None) compare as their strings
+        names, vocabulary = names.astype(str), vocabulary.astype(str)
+    
+    order = np.argsort(vocabulary, kind='stable')
+    slots = np.minimum(np.searchsorted(vocabulary[order], names), len(vocabulary) - 1)
+    found = vocabulary[order][slots] == names
+    return np.where(found, order[slots], UNKNOWN_CODE).astype(np.int64)
+
+def expected_demand(rows):
+    """Expected demand score for the given calendar rows"""
+    return (
+        BASE_DEMAND
+        + WEEKEND_DEMAND_BOOST * CALENDAR['is_weekend'][rows]
+        + PEAK_SEASON_DEMAND_BOOST * np.isin(CALENDAR['month'][rows], PEAK_DEMAND_MONTHS)
+    ).astype(np.float64)
@@ -0,0 +1,236 @@
+"""
+AI-Driven Price Forecasting System - Model Fleet
+Trains one linear price model per hotel/route in a single batched solve
+"""
+
+import pandas as pd
+import numpy as np
+import joblib
+import os
+from model import PriceForecastingModel
+from artifacts import read_artifact, write_artifact, entity_keys_from_json
+
+class PriceModelFleet:
+    """One linear price model per entity (hotel or route), stored as stacked arrays
+    
+    `coef` is an (n_entities x n_features) array and `intercept` an
+    (n_entities,) array whose rows follow `entity_vocab`. All entities share
+    one featurization, done once for the whole history.
+    """
+    
+    def __init__(self, model_type='hotel'):
+        self.model_type = model_type
+        self.featurizer = PriceForecastingModel(model_type)
+        self.coef = None
+        self.intercept = None
+        self.n_rows = None
+        self.is_trained = False
+    
+    @property
+    def entity_vocab(self):
+        return self.featurizer.entity_vocab
+    
+    @property
+    def feature_columns(self):
+        return self.featurizer.feature_columns
+    
+    def train(self, df, test_size=0.2, random_state=42):
+        """Fit every entity's model from one multi-entity DataFrame"""
+        
+        print(f"🤖 Training {self.model_type} model fleet...")
+        
+        keys = self.featurizer.entity_keys(df)
+        if keys is None:
+            raise ValueError(f"Fleet training needs entity key columns for {self.model_type} data")
+        
+        # Featurize all entities at once
+        self.featurizer.entity_vocab = keys.unique().sort_values().tolist()
+        codes = self.featurizer.encode_entities(df)
+        data, self.featurizer.feature_columns = self.featurizer._feature_arrays(df)
+        X = self.featurizer._stack_features(data, len(df))
+        y = df['price'].to_numpy(dtype=np.float64)
+        n_entities = len(self.entity_vocab)
+        
+        # Hold out a random share of every entity's rows
+        held_out = np.random.default_rng(random_state).random(len(df)) < test_size
+        train = ~held_out
+        
+        xtx, xty = grouped_normal_equations(X[train], y[train], codes[train], n_entities)
+        beta = solve_stacked(xtx, xty)
+        self.coef = np.ascontiguousarray(beta[:, :-1])
+        self.intercept = np.ascontiguousarray(beta[:, -1])
+        self.n_rows = np.bincount(codes[train], minlength=n_entities)
+        self.is_trained = True
+        
+        # Per-entity and overall held-out error
+        y_pred = self.predict_matrix(X, codes)
+        abs_error = np.abs(y - y_pred)
+        entity_test_mae = (
+            np.bincount(codes[held_out], weights=abs_error[held_out], minlength=n_entities)
+            / np.maximum(np.bincount(codes[held_out], minlength=n_entities), 1)
+        )
+        train_mae = abs_error[train].mean()
+        test_mae = abs_error[held_out].mean()
+        
+        print(f"📊 Fleet Performance ({n_entities} models):")
+        print(f"   Training MAE: ${train_mae:.2f}")
+        print(f"   Testing MAE: ${test_mae:.2f}")
+        print(f"   Worst entity testing MAE: ${entity_test_mae.max():.2f}")
+        
+        return {
+            'train_mae': train_mae,
+            'test_mae': test_mae,
+            'entity_test_mae': pd.Series(entity_test_mae, index=self.entity_index())
+        }
+    
+    def entity_index(self):
+        """Index mapping entity keys to rows of `coef`"""
+        if isinstance(self.entity_vocab[0], tuple):
+            return pd.MultiIndex.from_tuples(self.entity_vocab)
+        return pd.Index(self.entity_vocab)
+    
+    def predict_matrix(self, X, codes):
+        """Evaluate each row's own entity model on a prebuilt feature matrix"""
+        return np.einsum('ij,ij->i', X, self.coef[codes]) + self.intercept[codes]
+    
+    def predict(self, df):
+        """Predict prices for rows of known entities (NaN for unseen entities)"""
+        
+        if not self.is_trained:
+            raise ValueError("Fleet must be trained before making predictions")
+        
+        codes = self.featurizer.encode_entities(df)
+        X = self.featurizer.feature_matrix(df)
+        known = codes >= 0
+        predictions = np.full(len(df), np.nan)
+        predictions[known] = self.predict_matrix(X[known], codes[known])
+        return predictions
+    
+    def entity_model(self, entity):
+        """Standalone PriceForecastingModel for one entity key"""
+        
+        code = self.entity_index().get_loc(entity)
+        model = PriceForecastingModel(self.model_type)
+        model.category_vocabularies = self.featurizer.category_vocabularies
+        model.feature_columns = list(self.feature_columns)
+        model._set_coefficients(self.coef[code], self.intercept[code])
+        model.is_trained = True
+        return model
+    
+    def save(self, filepath):
+        """Save the fleet to file"""
+        joblib.dump({
+            'model_type': self.model_type,
+            'category_vocabularies': self.featurizer.category_vocabularies,
+            'feature_columns': self.feature_columns,
+            'entity_vocab': self.entity_vocab,
+            'coef': self.coef,
+            'intercept': self.intercept,
+            'n_rows': self.n_rows
+        }, filepath)
+        print(f"💾 Fleet saved to {filepath}")
+    
+    def load(self, filepath):
+        """Load a fleet from file"""
+        fleet_data = joblib.load(filepath)
+        self.model_type = fleet_data['model_type']
+        self.featurizer = PriceForecastingModel(self.model_type)
+        self.featurizer.category_vocabularies = fleet_data['category_vocabularies']
+        self.featurizer.feature_columns = fleet_data['feature_columns']
+        self.featurizer.entity_vocab = fleet_data['entity_vocab']
+        self.coef = fleet_data['coef']
+        self.intercept = fleet_data['intercept']
+        self.n_rows = fleet_data['n_rows']
+        self.is_trained = True
+        print(f"📂 Fleet loaded from {filepath}")
+    
+    def save_artifact(self, path):
+        """Save the fleet as a versioned artifact directory (see artifacts.py)"""
+        write_artifact(path, {
+            'kind': 'price_fleet',
+            'model_type': self.model_type,
+            'feature_columns': self.feature_columns,
+            'category_vocabularies': self.featurizer.category_vocabularies,
+            'entity_vocab': self.entity_vocab
+        }, {'coef': self.coef, 'intercept': self.intercept, 'n_rows': self.n_rows})
+        print(f"💾 Fleet artifact saved to {path}")
+    
+    def load_artifact(self, path, mmap=True):
+        """Load a fleet saved with `save_artifact`; with `mmap`, coefficient rows are paged in on use"""
+        manifest, arrays = read_artifact(path, mmap)
+        if manifest.get('kind') != 'price_fleet':
+            raise ValueError(f"{path} is not a price fleet artifact")
+        
+        self.model_type = manifest['model_type']
+        self.featurizer = PriceForecastingModel(self.model_type)
+        self.featurizer.category_vocabularies = manifest['category_vocabularies']
+        self.featurizer.feature_columns = manifest['feature_columns']
+        self.featurizer.entity_vocab = entity_keys_from_json(manifest['entity_vocab'])
+        self.coef = arrays['coef']
+        self.intercept = arrays['intercept']
+        self.n_rows = arrays['n_rows']
+        self.is_trained = True
+        print(f"📂 Fleet artifact loaded from {path}")
+
+def grouped_normal_equations(X, y, codes, n_groups):
+    """Per-group X'X and X'y (with a trailing intercept column) as stacked arrays
+    
+    Each distinct entry of the symmetric X'X is one weighted bincount over
+    all rows, so memory stays O(rows + groups x features^2).
+    """
+    X = np.column_stack([X, np.ones(len(X))])
+    n_terms = X.shape[1]
+    
+    xtx = np.empty((n_groups, n_terms, n_terms))
+    for i in range(n_terms):
+        for j in range(i, n_terms):
+            xtx[:, i, j] = xtx[:, j, i] = np.bincount(codes, weights=X[:, i] * X[:, j], minlength=n_groups)
+    
+    xty = np.column_stack([
+        np.bincount(codes, weights=X[:, i] * y, minlength=n_groups) for i in range(n_terms)
+    ])
+    return xtx, xty
+
+def solve_stacked(xtx, xty):
+    """Solve a stack of normal equations in one batched call
+    
+    Same unit-diagonal rescaling as NormalEquations.solve; if any entity's
+    system is singular (too few rows), the whole stack falls back to the
+    batched pseudo-inverse.
+    """
+    scale = np.sqrt(np.einsum('gii->gi', xtx))
+    scale[scale == 0] = 1.0
+    scaled = xtx / (scale[:, :, None] * scale[:, None, :])
+    rhs = (xty / scale)[:, :, None]
+    try:
+        beta = np.linalg.solve(scaled, rhs)[:, :, 0]
+    except np.linalg.LinAlgError:
+        beta = (np.linalg.pinv(scaled) @ rhs)[:, :, 0]
+    return beta / scale
+
+def train_fleets():
+    """Train hotel and flight fleets from the multi-entity datasets"""
+    
+    paths = {model_type: f'data/{model_type}_prices.csv' for model_type in ('hotel', 'flight')}
+    if not all(os.path.exists(path) for path in paths.values()):
+        print("❌ Data files not found. Please run data_generator.py --scale N first.")
+        return
+    
+    frames = {model_type: pd.read_csv(path) for model_type, path in paths.items()}
+    for model_type, df in frames.items():
+        if PriceModelFleet(model_type).featurizer.entity_keys(df) is None:
+            print(f"❌ {paths[model_type]} has no hotel/route keys. "
+                  f"Please run data_generator.py --scale N to generate multi-entity data.")
+            return
+    
+    os.makedirs('models', exist_ok=True)
+    
+    for model_type, df in frames.items():
+        print(f"\n{'🏨' if model_type == 'hotel' else '✈️'} Training {model_type.title()} Model Fleet")
+        fleet = PriceModelFleet(model_type)
+        fleet.train(df)
+        fleet.save(f'models/{model_type}_fleet.pkl')
+        fleet.save_artifact(f'models/{model_type}_fleet')
+
+if __name__ == "__main__":
+    train_fleets()
@@ -0,0 +1,327 @@
+"""
+AI-Driven Price Forecasting System - Inference Runtime
+Prediction-only price models that need NumPy alone (no sklearn, pandas or plotting)
+"""
+
+import numpy as np
+import hashlib
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from datetime import datetime, time, timedelta
+from features import (
+    CALENDAR, DAY_NAMES, SEASON_NAMES, calendar_rows, expected_demand, vocabulary_codes
+)
+from artifacts import read_artifact, entity_keys_from_json
+
+# Booking window assumed for flight predictions when none is given
+DEFAULT_ADVANCE_BOOKING_DAYS = 30
+
+# Demand score assumed for the current-price prediction
+CURRENT_DEMAND_SCORE = 105
+
+# Date-derived features gathered from the calendar table
+CALENDAR_FEATURES = ['year', 'month', 'day', 'day_of_year', 'week_of_year', 'is_weekend']
+
+# Calendar column and calendar-order names behind each categorical column
+CALENDAR_CATEGORIES = {
+    'day_of_week': ('weekday', DAY_NAMES),
+    'season': ('season', SEASON_NAMES),
+}
+
+def calendar_feature_arrays(rows, category_vocabularies):
+    """Date-derived and encoded features for the given calendar rows"""
+    data = {col: CALENDAR[col][rows] for col in CALENDAR_FEATURES}
+    for col, (calendar_col, names) in CALENDAR_CATEGORIES.items():
+        codes = vocabulary_codes(names, category_vocabularies[col])
+        data[f'{col}_encoded'] = codes[CALENDAR[calendar_col][rows]]
+    return data
+
+def stack_features(data, feature_columns, n_rows):
+    """Stack feature arrays (or scalars) into a float64 matrix in trained feature order"""
+    missing = [col for col in feature_columns if col not in data]
+    if missing:
+        raise ValueError(f"Missing features for prediction: {missing}")
+    
+    X = np.empty((n_rows, len(feature_columns)), dtype=np.float64)
+    for i, col in enumerate(feature_columns):
+        X[:, i] = data[col]
+    return X
+
+def model_version(model_type, feature_columns, category_vocabularies, coef, intercept, model_token=None):
+    """Short hash of everything that determines a model's predictions"""
+    digest = hashlib.sha1()
+    vocabularies = {col: list(vocabulary) for col, vocabulary in category_vocabularies.items()}
+    digest.update(repr((model_type, list(feature_columns), vocabularies)).encode())
+    if coef is not None:
+        digest.update(np.ascontiguousarray(coef, dtype=np.float64).tobytes())
+        digest.update(np.float64(intercept).tobytes())
+    elif model_token is not None:
+        digest.update(model_token.encode())
+    return digest.hexdigest()[:12]
+
+def future_trend_dates(current_date, days_ahead):
+    """The `days_ahead` days after `current_date`, as the caller's date type and as datetime64[D]
+    
+    `datetime` inputs (pandas Timestamps included) give `datetime`s at the
+    same time of day and in the same time zone; `date` inputs give `date`s.
+    """
+    day = current_date.date() if isinstance(current_date, datetime) else current_date
+    start = np.datetime64(day, 'D')
+    future_days = np.arange(start + 1, start + days_ahead + 1, dtype='datetime64[D]')
+    if not isinstance(current_date, datetime):
+        return future_days.tolist(), future_days
+    
+    time_of_day = current_date.replace(tzinfo=None) - datetime.combine(day, time())
+    future_dates = (future_days + np.timedelta64(time_of_day, 'us')).tolist()
+    if current_date.tzinfo is not None:
+        future_dates = [moment.replace(tzinfo=current_date.tzinfo) for moment in future_dates]
+    return future_dates, future_days
+
+def booking_recommendation(current_price, future_prices):
+    """Generate booking recommendation based on price trend"""
+    
+    avg_future_price = np.mean(future_prices)
+    price_change_percent = ((avg_future_price - current_price) / current_price) * 100
+    
+    if price_change_percent > 5:
+        recommendation = "📈 BOOK NOW"
+        reason = f"Prices expected to increase by {price_change_percent:.1f}%"
+        confidence = "High" if price_change_percent > 10 else "Medium"
+    elif price_change_percent < -5:
+        recommendation = "⏳ WAIT"
+        reason = f"Prices expected to decrease by {abs(price_change_percent):.1f}%"
+        confidence = "High" if price_change_percent < -10 else "Medium"
+    else:
+        recommendation = "🤔 NEUTRAL"
+        reason = f"Prices expected to remain stable ({price_change_percent:.1f}% change)"
+        confidence = "Medium"
+    
+    return {
+        'recommendation': recommendation,
+        'reason': reason,
+        'confidence': confidence,
+        'price_change_percent': price_change_percent,
+        'current_price': current_price,
+        'predicted_avg_price': avg_future_price
+    }
+
+def predict_dates(predict_matrix, feature_columns, category_vocabularies, dates,
+                  demand_scores=None, advance_booking_days=None):
+    """Predict prices for many dates in one vectorized pass
+    
+    `dates` may be a NumPy datetime64 array, DatetimeIndex, Series or a
+    list of dates. `demand_scores` and `advance_booking_days` may be
+    arrays aligned with `dates` or scalars; when omitted, demand defaults
+    to the expected demand of each date and the booking window to
+    DEFAULT_ADVANCE_BOOKING_DAYS. `predict_matrix` evaluates the model on
+    the stacked float64 feature matrix.
+    """
+    rows = calendar_rows(dates)
+    data = calendar_feature_arrays(rows, category_vocabularies)
+    data['demand_score'] = expected_demand(rows) if demand_scores is None else demand_scores
+    data['advance_booking_days'] = (
+        DEFAULT_ADVANCE_BOOKING_DAYS if advance_booking_days is None else advance_booking_days
+    )
+    return predict_matrix(stack_features(data, feature_columns, len(rows)))
+
+def predict_trend(predict_matrix, feature_columns, category_vocabularies, current_date,
+                  days_ahead=7, seed=None):
+    """Predict price trend for the `days_ahead` days after `current_date`
+    
+    Demand is the expected demand of each day, so the same request always
+    returns the same forecast. Pass `seed` to add reproducible +/-5 demand
+    noise instead.
+    """
+    future_dates, future_days = future_trend_dates(current_date, days_ahead)
+    
+    # Estimate demand score (simplified)
+    demand_scores = expected_demand(calendar_rows(future_days))
+    if seed is not None:
+        demand_scores += np.random.default_rng(seed).uniform(-5, 5, days_ahead)
+    
+    predictions = predict_dates(predict_matrix, feature_columns, category_vocabularies,
+                                future_days, demand_scores=demand_scores)
+    return future_dates, predictions
+
+def price_forecast(predict_matrix, feature_columns, category_vocabularies, current_date,
+                   days_ahead=7, demand_score=CURRENT_DEMAND_SCORE, advance_booking_days=None):
+    """Current price, future trend and booking recommendation for one request"""
+    current_price = float(predict_dates(predict_matrix, feature_columns, category_vocabularies,
+                                        [current_date], demand_score, advance_booking_days)[0])
+    future_dates, future_prices = predict_trend(predict_matrix, feature_columns, category_vocabularies,
+                                                current_date, days_ahead)
+    future_prices.flags.writeable = False
+    
+    return {
+        'current_price': current_price,
+        'future_dates': tuple(future_dates),
+        'future_prices': future_prices,
+        'recommendation': booking_recommendation(current_price, future_prices)
+    }
+
+class PriceInferenceModel:
+    """Serving-side linear price model
+    
+    Same prediction API and results as a trained PriceForecastingModel, but
+    built from its artifact (or the model itself) with NumPy only.
+    
+    Instances are frozen: attributes cannot be reassigned, the coefficient
+    array is a read-only private copy and vocabularies are tuples, and no
+    method writes to the instance, so one object can serve any number of
+    threads without locks.
+    """
+    
+    def __init__(self, model_type, feature_columns, category_vocabularies, coef, intercept,
+                 entity_vocab=(), data_fingerprint=None):
+        coef = np.array(coef, dtype=np.float64)
+        coef.flags.writeable = False
+        
+        self.model_type = model_type
+        self.feature_columns = tuple(feature_columns)
+        self.category_vocabularies = MappingProxyType(
+            {col: tuple(vocabulary) for col, vocabulary in category_vocabularies.items()}
+        )
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.entity_vocab = tuple(entity_vocab)
+        self.data_fingerprint = data_fingerprint
+        self.version = model_version(model_type, self.feature_columns, self.category_vocabularies,
+                                     self.coef, self.intercept)
+        self._frozen = True
+    
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"{type(self).__name__} is immutable; build a new instance instead")
+        object.__setattr__(self, name, value)
+    
+    @classmethod
+    def from_artifact(cls, path):
+        """Load a model saved with `PriceForecastingModel.save_artifact`"""
+        manifest, arrays = read_artifact(path, mmap=False)
+        if manifest.get('kind') != 'price_model':
+            raise ValueError(f"{path} is not a price model artifact")
+        return cls(
+            manifest['model_type'], manifest['feature_columns'], manifest['category_vocabularies'],
+            arrays['coef'], manifest['intercept'], entity_keys_from_json(manifest['entity_vocab']),
+            manifest.get('data_fingerprint')
+        )
+    
+    @classmethod
+    def from_model(cls, model):
+        """Snapshot a trained linear PriceForecastingModel"""
+        if not model.is_trained or model.coef is None:
+            raise ValueError("Only trained linear models can be served by the inference runtime")
+        return cls(model.model_type, model.feature_columns, model.category_vocabularies,
+                   model.coef, model.intercept, model.entity_vocab, model.data_fingerprint)
+    
+    def feature_arrays(self, rows):
+        """Feature arrays for a DataFrame or a mapping of column name -> values"""
+        if 'date' in rows:
+            data = calendar_feature_arrays(calendar_rows(rows['date']), self.category_vocabularies)
+        else:
+            data = {col: np.asarray(rows[col]) for col in ['month', 'is_weekend'] if col in rows}
+            for col, vocabulary in self.category_vocabularies.items():
+                if col in rows:
+                    data[f'{col}_encoded'] = vocabulary_codes(rows[col], vocabulary)
+        
+        for col in ['demand_score', 'advance_booking_days']:
+            if col in rows:
+                data[col] = np.asarray(rows[col])
+        return data
+    
+    def feature_matrix(self, rows):
+        """Build the float64 feature matrix in trained feature order"""
+        n_rows = len(rows[next(iter(rows))])
+        return stack_features(self.feature_arrays(rows), self.feature_columns, n_rows)
+    
+    def predict(self, rows):
+        """Make price predictions"""
+        return self.predict_matrix(self.feature_matrix(rows))
+    
+    def predict_many(self, dates, demand_scores=None, advance_booking_days=None):
+        """Predict prices for many dates in one vectorized pass (see `predict_dates`)"""
+        return predict_dates(self.predict_matrix, self.feature_columns, self.category_vocabularies,
+                             dates, demand_scores, advance_booking_days)
+    
+    def predict_matrix(self, X):
+        """Evaluate the linear model on a prebuilt float64 feature matrix"""
+        return X @ self.coef + self.intercept
+    
+    def predict_future_trend(self, current_date, days_ahead=7, seed=None):
+        """Predict price trend for future dates (see `predict_trend`)"""
+        return predict_trend(self.predict_matrix, self.feature_columns, self.category_vocabularies,
+                             current_date, days_ahead, seed)
+    
+    def forecast(self, current_date, days_ahead=7, demand_score=CURRENT_DEMAND_SCORE,
+                 advance_booking_days=None):
+        """Current price, future trend and booking recommendation for one request"""
+        return price_forecast(self.predict_matrix, self.feature_columns, self.category_vocabularies,
+                              current_date, days_ahead, demand_score, advance_booking_days)
+    
+    def get_recommendation(self, current_price, future_prices):
+        """Generate booking recommendation based on price trend"""
+        return booking_recommendation(current_price, future_prices)
+
+class ForecastCache:
+    """Thread-safe LRU cache of forecasts whose entries expire at the next midnight"""
+    
+    def __init__(self, max_entries=1024, clock=datetime.now):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, computing and storing it on a miss"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        value = compute()
+        
+        # Forecasts are keyed by start date, so nothing stays valid past midnight
+        expires = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries)
+            }
+
+# Shared by every caller (and every Streamlit session) in the process
+FORECAST_CACHE = ForecastCache()
+
+def cached_forecast(model, current_date, days_ahead=7, cache=FORECAST_CACHE, **overrides):
+    """`model.forecast(...)` served from the forecast cache
+    
+    Keyed by model type, model version, start date, horizon and feature
+    overrides, so a retrained model never serves stale forecasts.
+    """
+    key = (model.model_type, model.version, current_date, days_ahead, tuple(sorted(overrides.items())))
+    return cache.get_or_compute(key, lambda: model.forecast(current_date, days_ahead, **overrides))
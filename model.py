@@ -7,58 +7,380 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
+import argparse
 import os
-from datetime import datetime, timedelta
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import matplotlib.pyplot as plt
 import seaborn as sns
+from data_generator import ENTITY_COLUMNS, HOTEL_COLUMNS, FLIGHT_COLUMNS
+from artifacts import read_artifact, write_artifact, entity_keys_from_json
+from features import DAY_NAMES, SEASON_NAMES, UNKNOWN_CODE, calendar_rows
+from inference import (
+    CURRENT_DEMAND_SCORE, FORECAST_CACHE, ForecastCache, PriceInferenceModel,
+    booking_recommendation, cached_forecast, calendar_feature_arrays, model_version,
+    predict_dates, predict_trend, price_forecast, stack_features
+)
+
+# Closed vocabularies of the categorical columns. A value's code is its
+# position in the sorted vocabulary (the codes LabelEncoder used to assign);
+# anything else maps to the UNKNOWN_CODE bucket
+CATEGORY_VOCABULARIES = {
+    'day_of_week': sorted(DAY_NAMES),
+    'season': sorted(SEASON_NAMES),
+}
+
+def encode_categories(values, vocabulary):
+    """Vectorized code of each value in `vocabulary`, UNKNOWN_CODE for unseen or missing values"""
+    codes = pd.Categorical(values, categories=vocabulary).codes.astype(np.int64)
+    return np.where(codes >= 0, codes, UNKNOWN_CODE)
+
+# Source columns whose values identify a training row (partition keys and
+# other layout-only columns are left out of the data fingerprint)
+FINGERPRINT_COLUMNS = {
+    'hotel': HOTEL_COLUMNS,
+    'flight': FLIGHT_COLUMNS,
+}
+
+class RowFingerprint:
+    """Fingerprint of the rows a model was trained on, independent of file layout
+    
+    Each row is hashed from normalised values of its `columns` (dates at
+    day resolution, strings and categoricals as text, integers as int64,
+    floats as float64, columns in sorted order), and the row hashes are
+    summed. The result identifies the rows themselves: CSV, Parquet or
+    Feather input, any chunking, partitioning or row order all give the
+    same fingerprint, and partial fingerprints merge like NormalEquations.
+    """
+    
+    def __init__(self, columns):
+        self.columns = sorted(columns)
+        self.present = None
+        self.n_rows = 0
+        self.sums = np.zeros(2, dtype=np.uint64)
+    
+    def add(self, df):
+        """Fold the rows of `df` into the fingerprint"""
+        columns = [col for col in self.columns if col in df.columns]
+        if self.present is None:
+            self.present = columns
+        elif columns != self.present:
+            raise ValueError(f"Rows with columns {columns} cannot join a fingerprint of {self.present}")
+        
+        normalised = {}
+        for col in columns:
+            values = df[col]
+            if col == 'date':
+                normalised[col] = pd.to_datetime(values).to_numpy().astype('datetime64[D]')
+            elif pd.api.types.is_bool_dtype(values) or pd.api.types.is_integer_dtype(values):
+                normalised[col] = values.to_numpy(dtype=np.int64)
+            elif pd.api.types.is_float_dtype(values):
+                normalised[col] = values.to_numpy(dtype=np.float64)
+            else:
+                normalised[col] = values.astype(str).to_numpy()
+        
+        # Two independent 64-bit sums of the row hashes (wrapping), so the total is order-free
+        row_hashes = pd.util.hash_pandas_object(pd.DataFrame(normalised), index=False).to_numpy()
+        self.sums += np.array([row_hashes.sum(dtype=np.uint64),
+                               pd.util.hash_array(row_hashes).sum(dtype=np.uint64)], dtype=np.uint64)
+        self.n_rows += len(df)
+        return self
+    
+    def merge(self, other):
+        """Add another partial fingerprint of the same columns into this one"""
+        if self.present is None:
+            self.present = other.present
+        elif other.present is not None and other.present != self.present:
+            raise ValueError(f"Cannot merge fingerprints of {other.present} and {self.present}")
+        self.sums += other.sums
+        self.n_rows += other.n_rows
+        return self
+    
+    def hexdigest(self):
+        """Short hex digest of the rows added so far"""
+        state = (self.present, self.n_rows, [int(value) for value in self.sums])
+        return hashlib.sha1(repr(state).encode()).hexdigest()[:16]
+    
+    def to_dict(self):
+        """Plain-Python form, for pickling into other processes or manifests"""
+        return {'columns': self.columns, 'present': self.present, 'n_rows': self.n_rows,
+                'sums': [int(value) for value in self.sums]}
+    
+    @classmethod
+    def from_dict(cls, data):
+        fingerprint = cls(data['columns'])
+        fingerprint.present = data['present']
+        fingerprint.n_rows = data['n_rows']
+        fingerprint.sums = np.array(data['sums'], dtype=np.uint64)
+        return fingerprint
+
+class NormalEquations:
+    """Sufficient statistics of a least-squares fit with intercept
+    
+    Holds X'X and X'y (with a trailing column of ones for the intercept),
+    y'y and the row count. Statistics from separate batches add up, so a
+    fit can be extended or merged without revisiting old rows.
+    """
+    
+    def __init__(self, n_features):
+        n_terms = n_features + 1
+        self.xtx = np.zeros((n_terms, n_terms))
+        self.xty = np.zeros(n_terms)
+        self.yty = 0.0
+        self.n_rows = 0.0
+    
+    def add(self, X, y, forgetting=1.0):
+        """Fold in rows of X, y; existing statistics are first scaled by `forgetting`"""
+        if forgetting != 1.0:
+            self.xtx *= forgetting
+            self.xty *= forgetting
+            self.yty *= forgetting
+            self.n_rows *= forgetting
+        
+        X = np.column_stack([np.asarray(X, dtype=np.float64), np.ones(len(X))])
+        y = np.asarray(y, dtype=np.float64)
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.n_rows += len(y)
+        return self
+    
+    def merge(self, other):
+        """Add another batch's statistics into these"""
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+        self.n_rows += other.n_rows
+        return self
+    
+    def solve(self):
+        """Least-squares coefficients and intercept"""
+        # Rescale to unit diagonal so features of very different magnitude
+        # (day_of_year vs is_weekend) don't hurt the conditioning
+        scale = np.sqrt(np.diag(self.xtx))
+        scale[scale == 0] = 1.0
+        scaled = self.xtx / np.outer(scale, scale)
+        try:
+            beta = np.linalg.solve(scaled, self.xty / scale)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(scaled, self.xty / scale, rcond=None)[0]
+        beta /= scale
+        return beta[:-1], float(beta[-1])
+    
+    def r2(self, coef, intercept):
+        """Coefficient of determination of `coef`, `intercept` on the accumulated rows"""
+        beta = np.append(coef, intercept)
+        sse = self.yty - 2 * beta @ self.xty + beta @ self.xtx @ beta
+        sst = self.yty - self.xty[-1] ** 2 / self.n_rows
+        return float(1 - sse / sst)
+    
+    def to_dict(self):
+        """Plain-array form for model artifacts"""
+        return {'xtx': self.xtx, 'xty': self.xty, 'yty': self.yty, 'n_rows': self.n_rows}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild statistics saved with `to_dict`"""
+        stats = cls(len(data['xty']) - 1)
+        stats.xtx = np.array(data['xtx'], dtype=np.float64)
+        stats.xty = np.array(data['xty'], dtype=np.float64)
+        stats.yty = float(data['yty'])
+        stats.n_rows = float(data['n_rows'])
+        return stats
+
+class ReservoirSample:
+    """Uniform random sample of at most `capacity` rows from a stream of (X, y) batches"""
+    
+    def __init__(self, capacity, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.X = None
+        self.y = np.empty(0)
+        self._keys = np.empty(0)
+    
+    def add(self, X, y):
+        """Offer a batch of rows to the sample"""
+        # Every row gets a random key; the sample is the rows with the smallest keys
+        keys = np.concatenate([self._keys, self.rng.random(len(y))])
+        X = X if self.X is None else np.concatenate([self.X, X])
+        y = np.concatenate([self.y, y])
+        if len(keys) > self.capacity:
+            keep = np.argpartition(keys, self.capacity)[:self.capacity]
+            keys, X, y = keys[keep], X[keep], y[keep]
+        self._keys, self.X, self.y = keys, X, y
+
+def iter_price_chunks(path, chunksize=100_000):
+    """Yield DataFrames of at most `chunksize` rows from a CSV, Parquet or Feather source
+    
+    Directories are read as (hive-partitioned) Parquet datasets, or Feather
+    ones when they contain .feather files.
+    """
+    if str(path).endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunksize, parse_dates=['date'])
+        return
+    
+    import pyarrow.dataset as ds
+    
+    if os.path.isdir(path):
+        names = [name for _, _, files in os.walk(path) for name in files]
+        fmt = 'feather' if any(name.endswith('.feather') for name in names) else 'parquet'
+    else:
+        fmt = 'feather' if str(path).endswith('.feather') else 'parquet'
+    
+    dataset = ds.dataset(path, format=fmt, partitioning='hive')
+    for batch in dataset.to_batches(batch_size=chunksize):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+class ErrorSummary:
+    """Mergeable prediction error totals: row count, absolute and squared errors, target moments"""
+    
+    def __init__(self):
+        self.n_rows = 0
+        self.abs_error = 0.0
+        self.sq_error = 0.0
+        self.y_sum = 0.0
+        self.y_sq_sum = 0.0
+    
+    def add(self, y, y_pred):
+        """Accumulate errors of one batch"""
+        residual = y - y_pred
+        self.n_rows += len(y)
+        self.abs_error += float(np.abs(residual).sum())
+        self.sq_error += float(residual @ residual)
+        self.y_sum += float(y.sum())
+        self.y_sq_sum += float(y @ y)
+        return self
+    
+    def merge(self, other):
+        """Add another summary's totals into this one"""
+        for name, value in other.to_dict().items():
+            setattr(self, name, getattr(self, name) + value)
+        return self
+    
+    def mae(self):
+        """Mean absolute error"""
+        return self.abs_error / self.n_rows
+    
+    def r2(self):
+        """Coefficient of determination"""
+        return 1 - self.sq_error / (self.y_sq_sum - self.y_sum ** 2 / self.n_rows)
+    
+    def to_dict(self):
+        """Plain form for shipping between workers"""
+        return dict(vars(self))
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a summary saved with `to_dict`"""
+        summary = cls()
+        for name, value in data.items():
+            setattr(summary, name, value)
+        return summary
+
+def list_partitions(path):
+    """Data files under `path` (sorted), or `path` itself if it is a file"""
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(path)
+        for name in files
+        if name.endswith(('.csv', '.parquet', '.feather'))
+    )
+
+def _partition_statistics(model, task):
+    """Map task: normal-equation statistics of one partition's training rows"""
+    path, chunksize, test_size, seed = task
+    stats = None
+    entities = set()
+    fingerprint = RowFingerprint(FINGERPRINT_COLUMNS[model.model_type])
+    batches = model._training_batches(path, chunksize, test_size, np.random.default_rng(seed), fingerprint)
+    for X, y, held_out, keys in batches:
+        if stats is None:
+            stats = NormalEquations(len(model.feature_columns))
+        stats.add(X[~held_out], y[~held_out])
+        entities.update(keys)
+    
+    if stats is None:
+        return None
+    return {'feature_columns': model.feature_columns, 'statistics': stats.to_dict(), 'entities': sorted(entities),
+            'fingerprint': fingerprint.to_dict()}
+
+def _partition_errors(model, task):
+    """Map task: train and held-out error summaries of one partition under the merged model"""
+    path, chunksize, test_size, seed = task
+    train_errors, test_errors = ErrorSummary(), ErrorSummary()
+    for X, y, held_out, _ in model._training_batches(path, chunksize, test_size, np.random.default_rng(seed)):
+        y_pred = model.predict_matrix(X)
+        train_errors.add(y[~held_out], y_pred[~held_out])
+        test_errors.add(y[held_out], y_pred[held_out])
+    return train_errors.to_dict(), test_errors.to_dict()
 
 class PriceForecastingModel:
     """ML Model for predicting hotel and flight prices"""
     
-    def __init__(self, model_type='hotel'):
+    def __init__(self, model_type='hotel', forgetting=1.0, estimator=None):
         self.model_type = model_type
-        self.model = LinearRegression()
-        self.label_encoders = {}
+        self.forgetting = forgetting
+        self.normal_equations = None
+        self.model = LinearRegression() if estimator is None else estimator
+        self.category_vocabularies = {col: list(vocab) for col, vocab in CATEGORY_VOCABULARIES.items()}
         self.feature_columns = []
+        self.entity_vocab = []
+        self.coef = None
+        self.intercept = 0.0
+        self.model_token = None
+        self.row_fingerprint = None
+        self.data_fingerprint = None
         self.is_trained = False
         
     def prepare_features(self, df):
         """Prepare features for machine learning"""
         
-        # Create a copy to avoid modifying original data
-        data = df.copy()
+        data, feature_columns = self._feature_arrays(df)
+        self.feature_columns = feature_columns
+        
+        return pd.DataFrame({col: data[col] for col in feature_columns}, index=df.index)
+    
+    def feature_matrix(self, df):
+        """Build the float64 feature matrix for `df` in the trained feature order"""
         
-        # Convert date to datetime if it's not already
-        if 'date' in data.columns:
-            data['date'] = pd.to_datetime(data['date'])
-            
-            # Extract date features
-            data['year'] = data['date'].dt.year
-            data['month'] = data['date'].dt.month
-            data['day'] = data['date'].dt.day
-            data['day_of_year'] = data['date'].dt.dayofyear
-            data['week_of_year'] = data['date'].dt.isocalendar().week
-        
-        # Encode categorical variables
-        categorical_columns = ['day_of_week', 'season']
-        
-        for col in categorical_columns:
-            if col in data.columns:
-                if col not in self.label_encoders:
-                    self.label_encoders[col] = LabelEncoder()
-                    data[f'{col}_encoded'] = self.label_encoders[col].fit_transform(data[col])
-                else:
-                    # Handle unseen categories during prediction
-                    try:
-                        data[f'{col}_encoded'] = self.label_encoders[col].transform(data[col])
-                    except ValueError:
-                        # If unseen category, use most frequent category
-                        most_frequent = self.label_encoders[col].classes_[0]
-                        data[col] = data[col].fillna(most_frequent)
-                        data[f'{col}_encoded'] = self.label_encoders[col].transform(data[col])
+        data, _ = self._feature_arrays(df)
+        return self._stack_features(data, len(df))
+    
+    def _stack_features(self, data, n_rows):
+        """Stack feature arrays (or scalars) into a float64 matrix in trained feature order"""
+        return stack_features(data, self.feature_columns, n_rows)
+    
+    def _calendar_arrays(self, rows):
+        """Date-derived and encoded features for the given calendar rows"""
+        return calendar_feature_arrays(rows, self.category_vocabularies)
+    
+    def _feature_arrays(self, df):
+        """Compute feature columns as plain arrays, plus the feature list they support"""
+        
+        # Build plain column arrays; the input frame (entity keys included)
+        # is never copied
+        if 'date' in df.columns:
+            # Gather every date-derived feature from the precomputed calendar
+            data = self._calendar_arrays(calendar_rows(df['date']))
+        else:
+            # Without dates, use the calendar columns and categories as given
+            data = {}
+            for col in ['month', 'is_weekend']:
+                if col in df.columns:
+                    data[col] = df[col].to_numpy()
+            for col, vocabulary in self.category_vocabularies.items():
+                if col in df.columns:
+                    data[f'{col}_encoded'] = encode_categories(df[col], vocabulary)
+        
+        for col in ['demand_score', 'advance_booking_days']:
+            if col in df.columns:
+                data[col] = df[col].to_numpy()
         
         # Select features for training
         feature_columns = [
@@ -67,14 +389,33 @@ class PriceForecastingModel:
         ]
         
         # Add model-specific features
-        if self.model_type == 'flight' and 'advance_booking_days' in data.columns:
+        if self.model_type == 'flight' and 'advance_booking_days' in data:
             feature_columns.append('advance_booking_days')
         
         # Filter only existing columns
-        feature_columns = [col for col in feature_columns if col in data.columns]
-        self.feature_columns = feature_columns
+        feature_columns = [col for col in feature_columns if col in data]
         
-        return data[feature_columns]
+        return data, feature_columns
+    
+    def entity_keys(self, df):
+        """Entity key of each row (a MultiIndex for routes), or None for single-entity data"""
+        columns = ENTITY_COLUMNS[self.model_type]
+        if not all(col in df.columns for col in columns):
+            return None
+        if len(columns) == 1:
+            return pd.Index(df[columns[0]])
+        return pd.MultiIndex.from_arrays([df[col] for col in columns])
+    
+    def encode_entities(self, df):
+        """Map each row's entity key to its int code in the trained vocabulary (-1 if unseen)"""
+        keys = self.entity_keys(df)
+        if keys is None or not self.entity_vocab:
+            return np.full(len(df), -1, dtype=np.int32)
+        if isinstance(keys, pd.MultiIndex):
+            vocab = pd.MultiIndex.from_tuples(self.entity_vocab)
+        else:
+            vocab = pd.Index(self.entity_vocab)
+        return vocab.get_indexer(keys).astype(np.int32)
     
     def train(self, df):
         """Train the price forecasting model"""
@@ -85,6 +426,13 @@ class PriceForecastingModel:
         X = self.prepare_features(df)
         y = df['price']
         
+        # Remember the entities seen in training (multi-entity datasets only)
+        keys = self.entity_keys(df)
+        self.entity_vocab = [] if keys is None else keys.unique().sort_values().tolist()
+        
+        self.row_fingerprint = RowFingerprint(FINGERPRINT_COLUMNS[self.model_type]).add(df)
+        self.data_fingerprint = self.row_fingerprint.hexdigest()
+        
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, shuffle=True
@@ -93,6 +441,12 @@ class PriceForecastingModel:
         # Train model
         self.model.fit(X_train, y_train)
         
+        # Keep the sufficient statistics of a least-squares fit for incremental updates
+        if isinstance(self.model, LinearRegression):
+            self.normal_equations = NormalEquations(len(self.feature_columns)).add(X_train, y_train)
+        else:
+            self.normal_equations = None
+        
         # Make predictions
         y_pred_train = self.model.predict(X_train)
         y_pred_test = self.model.predict(X_test)
@@ -103,23 +457,156 @@ class PriceForecastingModel:
         train_r2 = r2_score(y_train, y_pred_train)
         test_r2 = r2_score(y_test, y_pred_test)
         
+        self._sync_coefficients()
+        self.is_trained = True
+        return self._report_metrics(train_mae, test_mae, train_r2, test_r2)
+    
+    def train_streaming(self, path, chunksize=100_000, test_size=0.2,
+                        eval_sample_size=50_000, random_state=42):
+        """Train out-of-core from a CSV file or Parquet/Feather file or directory
+        
+        Reads `path` in chunks, featurizes each chunk and folds its training
+        rows into normal-equation statistics, while a bounded random sample
+        of held-out rows (and one of training rows) is kept for evaluation.
+        Memory is bounded by `chunksize` and `eval_sample_size`, whatever
+        the size of the input. Produces the same artifact as `train`.
+        """
+        
+        if not isinstance(self.model, LinearRegression):
+            raise ValueError("Out-of-core training fits least squares; use train() for other estimators")
+        
+        print(f"🤖 Training {self.model_type} price forecasting model out-of-core from {path}...")
+        
+        rng = np.random.default_rng(random_state)
+        train_sample = ReservoirSample(eval_sample_size, rng)
+        test_sample = ReservoirSample(eval_sample_size, rng)
+        entities = set()
+        stats = None
+        fingerprint = RowFingerprint(FINGERPRINT_COLUMNS[self.model_type])
+        
+        for X, y, held_out, keys in self._training_batches(path, chunksize, test_size, rng, fingerprint):
+            if stats is None:
+                stats = NormalEquations(len(self.feature_columns))
+            stats.add(X[~held_out], y[~held_out])
+            train_sample.add(X[~held_out], y[~held_out])
+            test_sample.add(X[held_out], y[held_out])
+            entities.update(keys)
+        
+        if stats is None:
+            raise ValueError(f"No training rows found in {path}")
+        
+        self.normal_equations = stats
+        self.entity_vocab = sorted(entities)
+        self.row_fingerprint = fingerprint
+        self.data_fingerprint = fingerprint.hexdigest()
+        self._set_coefficients(*self.normal_equations.solve())
+        self.is_trained = True
+        
+        # Training R² is exact from the statistics; MAE comes from the samples
+        train_mae = mean_absolute_error(train_sample.y, self.predict_matrix(train_sample.X))
+        test_mae = mean_absolute_error(test_sample.y, self.predict_matrix(test_sample.X))
+        train_r2 = self.normal_equations.r2(self.coef, self.intercept)
+        test_r2 = r2_score(test_sample.y, self.predict_matrix(test_sample.X))
+        
+        return self._report_metrics(train_mae, test_mae, train_r2, test_r2)
+    
+    def train_distributed(self, path, n_workers=None, chunksize=100_000, test_size=0.2, random_state=42):
+        """Map-reduce training over the files of a dataset directory
+        
+        Each file or partition is a map task run in a process pool: the
+        first pass emits partial normal-equation statistics, which are summed
+        and solved once; the second pass emits error summaries for the solved
+        coefficients, which are summed into exact train/test metrics. Every
+        partition draws its held-out rows from its own spawned seed, so the
+        merged model does not depend on `n_workers`. Partials are plain
+        dicts of arrays, so the pool can be swapped for remote workers.
+        """
+        
+        if not isinstance(self.model, LinearRegression):
+            raise ValueError("Distributed training fits least squares; use train() for other estimators")
+        
+        partitions = list_partitions(path)
+        print(f"🤖 Training {self.model_type} price forecasting model on "
+              f"{len(partitions)} partitions with {n_workers or os.cpu_count()} workers...")
+        
+        seeds = np.random.SeedSequence(random_state).spawn(len(partitions))
+        tasks = [(path, chunksize, test_size, seed) for path, seed in zip(partitions, seeds)]
+        
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # Map: partial statistics per partition; reduce: sum and solve
+            partials = list(pool.map(partial(_partition_statistics, self), tasks))
+            partials = [result for result in partials if result is not None]
+            if not partials:
+                raise ValueError(f"No training rows found in {path}")
+            
+            self.feature_columns = partials[0]['feature_columns']
+            stats = NormalEquations.from_dict(partials[0]['statistics'])
+            for result in partials[1:]:
+                stats.merge(NormalEquations.from_dict(result['statistics']))
+            
+            self.normal_equations = stats
+            self.entity_vocab = sorted({key for result in partials for key in result['entities']})
+            fingerprint = RowFingerprint(FINGERPRINT_COLUMNS[self.model_type])
+            for result in partials:
+                fingerprint.merge(RowFingerprint.from_dict(result['fingerprint']))
+            self.row_fingerprint = fingerprint
+            self.data_fingerprint = fingerprint.hexdigest()
+            self._set_coefficients(*stats.solve())
+            self.is_trained = True
+            
+            # Map: error summaries of the merged model; reduce: sum
+            summaries = list(pool.map(partial(_partition_errors, self), tasks))
+        
+        train_errors, test_errors = ErrorSummary(), ErrorSummary()
+        for train_summary, test_summary in summaries:
+            train_errors.merge(ErrorSummary.from_dict(train_summary))
+            test_errors.merge(ErrorSummary.from_dict(test_summary))
+        
+        return self._report_metrics(train_errors.mae(), test_errors.mae(), train_errors.r2(), test_errors.r2())
+    
+    def _training_batches(self, path, chunksize, test_size, rng, fingerprint=None):
+        """Yield featurized chunks of `path` as (X, y, held-out mask, entity keys)
+        
+        Chunk rows are folded into `fingerprint` (a RowFingerprint) when given.
+        """
+        for chunk in iter_price_chunks(path, chunksize):
+            if fingerprint is not None:
+                fingerprint.add(chunk)
+            data, feature_columns = self._feature_arrays(chunk)
+            self.feature_columns = feature_columns
+            X = self._stack_features(data, len(chunk))
+            y = chunk['price'].to_numpy(dtype=np.float64)
+            
+            # Hold out a random share of every chunk for evaluation
+            held_out = rng.random(len(chunk)) < test_size
+            
+            keys = self.entity_keys(chunk)
+            yield X, y, held_out, [] if keys is None else keys.unique().tolist()
+    
+    def _report_metrics(self, train_mae, test_mae, train_r2, test_r2):
+        """Print evaluation metrics and top features, and return them"""
+        
         print(f"📊 Model Performance:")
         print(f"   Training MAE: ${train_mae:.2f}")
         print(f"   Testing MAE: ${test_mae:.2f}")
         print(f"   Training R²: {train_r2:.3f}")
         print(f"   Testing R²: {test_r2:.3f}")
         
-        # Feature importance
+        # Feature importance (coefficient magnitudes; tree ensembles may expose none)
+        if self.coef is not None:
+            importance = abs(self.coef)
+        else:
+            importance = getattr(self.model, 'feature_importances_', np.full(len(self.feature_columns), np.nan))
         feature_importance = pd.DataFrame({
             'feature': self.feature_columns,
-            'importance': abs(self.model.coef_)
+            'importance': importance
         }).sort_values('importance', ascending=False)
         
-        print(f"\n🔍 Top Features:")
-        for _, row in feature_importance.head(5).iterrows():
-            print(f"   {row['feature']}: {row['importance']:.2f}")
+        if feature_importance['importance'].notna().any():
+            print(f"\n🔍 Top Features:")
+            for _, row in feature_importance.head(5).iterrows():
+                print(f"   {row['feature']}: {row['importance']:.2f}")
         
-        self.is_trained = True
         return {
             'train_mae': train_mae,
             'test_mae': test_mae,
@@ -128,95 +615,128 @@ class PriceForecastingModel:
             'feature_importance': feature_importance
         }
     
+    def update(self, new_rows):
+        """Fold newly observed rows (with a price column) into the model
+        
+        Costs O(new rows): only the new rows are featurized and added to the
+        stored normal equations, which are then re-solved. With
+        `forgetting` < 1 older observations are down-weighted at every update.
+        Entities first seen in the new rows join `entity_vocab`, and the rows
+        are folded into the data fingerprint (which is cleared when the model
+        has no running fingerprint to extend, e.g. older saved models).
+        """
+        
+        if self.normal_equations is None:
+            raise ValueError("Model has no training statistics; retrain it to enable incremental updates")
+        
+        X = self.feature_matrix(new_rows)
+        self.normal_equations.add(X, new_rows['price'], self.forgetting)
+        self._set_coefficients(*self.normal_equations.solve())
+        
+        keys = self.entity_keys(new_rows)
+        if keys is not None:
+            self.entity_vocab = sorted(set(self.entity_vocab).union(keys.unique().tolist()))
+        if self.row_fingerprint is not None:
+            self.data_fingerprint = self.row_fingerprint.add(new_rows).hexdigest()
+        else:
+            self.data_fingerprint = None
+        
+        return {'rows_added': len(new_rows), 'effective_rows': self.normal_equations.n_rows}
+    
+    def _set_coefficients(self, coef, intercept):
+        """Install solved coefficients in both the estimator and the inference kernel"""
+        self.model.coef_ = np.asarray(coef, dtype=np.float64)
+        self.model.intercept_ = float(intercept)
+        self.model.n_features_in_ = len(self.feature_columns)
+        self.model.feature_names_in_ = np.array(self.feature_columns, dtype=object)
+        self._sync_coefficients()
+    
+    def freeze(self):
+        """Immutable, thread-safe inference snapshot of the trained (linear) model
+        
+        This object keeps training-time state and is not meant to be shared
+        across threads while it is being trained or updated; serve the
+        snapshot instead.
+        """
+        return PriceInferenceModel.from_model(self)
+    
     def predict(self, df):
         """Make price predictions"""
         
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
-        X = self.prepare_features(df)
-        predictions = self.model.predict(X)
-        
-        return predictions
-    
-    def predict_future_trend(self, current_date, days_ahead=7):
-        """Predict price trend for future dates"""
-        
-        future_dates = []
-        for i in range(1, days_ahead + 1):
-            future_date = current_date + timedelta(days=i)
-            future_dates.append(future_date)
-        
-        # Create future data with estimated features
-        future_data = []
-        for date in future_dates:
-            # Estimate demand score (simplified)
-            base_demand = 100
-            weekend_boost = 10 if date.weekday() >= 5 else 0
-            seasonal_boost = 15 if date.month in [6, 7, 8, 12] else 0
-            demand_score = base_demand + weekend_boost + seasonal_boost + np.random.uniform(-5, 5)
-            
-            future_data.append({
-                'date': date,
-                'day_of_week': date.strftime('%A'),
-                'month': date.month,
-                'is_weekend': 1 if date.weekday() >= 5 else 0,
-                'season': self._get_season(date.month),
-                'demand_score': demand_score,
-                'advance_booking_days': 30 if self.model_type == 'flight' else None
-            })
+        return self.predict_matrix(self.feature_matrix(df))
+    
+    def predict_many(self, dates, demand_scores=None, advance_booking_days=None):
+        """Predict prices for many dates in one vectorized pass (see `predict_dates`)"""
+        
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
         
-        future_df = pd.DataFrame(future_data)
-        predictions = self.predict(future_df)
+        return predict_dates(self.predict_matrix, self.feature_columns, self.category_vocabularies,
+                             dates, demand_scores, advance_booking_days)
+    
+    def predict_matrix(self, X):
+        """Evaluate the model on a prebuilt float64 feature matrix"""
         
-        return future_dates, predictions
+        if self.coef is None:
+            # Non-linear estimators have no kernel; they were fitted on named columns
+            return self.model.predict(pd.DataFrame(X, columns=self.feature_columns))
+        return X @ self.coef + self.intercept
     
-    def get_recommendation(self, current_price, future_prices):
-        """Generate booking recommendation based on price trend"""
+    def _sync_coefficients(self):
+        """Mirror a linear estimator's coefficients into contiguous float64 arrays"""
+        if not hasattr(self.model, 'coef_'):
+            # Fingerprint taken once per fit: pickling can change an estimator's hash
+            self.coef, self.intercept = None, 0.0
+            self.model_token = joblib.hash(self.model)
+            return
+        self.coef = np.ascontiguousarray(self.model.coef_, dtype=np.float64)
+        self.intercept = float(self.model.intercept_)
+    
+    def predict_future_trend(self, current_date, days_ahead=7, seed=None):
+        """Predict price trend for future dates (see `predict_trend`)"""
         
-        avg_future_price = np.mean(future_prices)
-        price_change_percent = ((avg_future_price - current_price) / current_price) * 100
-        
-        if price_change_percent > 5:
-            recommendation = "📈 BOOK NOW"
-            reason = f"Prices expected to increase by {price_change_percent:.1f}%"
-            confidence = "High" if price_change_percent > 10 else "Medium"
-        elif price_change_percent < -5:
-            recommendation = "⏳ WAIT"
-            reason = f"Prices expected to decrease by {abs(price_change_percent):.1f}%"
-            confidence = "High" if price_change_percent < -10 else "Medium"
-        else:
-            recommendation = "🤔 NEUTRAL"
-            reason = f"Prices expected to remain stable ({price_change_percent:.1f}% change)"
-            confidence = "Medium"
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
         
-        return {
-            'recommendation': recommendation,
-            'reason': reason,
-            'confidence': confidence,
-            'price_change_percent': price_change_percent,
-            'current_price': current_price,
-            'predicted_avg_price': avg_future_price
-        }
+        return predict_trend(self.predict_matrix, self.feature_columns, self.category_vocabularies,
+                             current_date, days_ahead, seed)
     
-    def _get_season(self, month):
-        """Convert month to season"""
-        if month in [12, 1, 2]:
-            return 'Winter'
-        elif month in [3, 4, 5]:
-            return 'Spring'
-        elif month in [6, 7, 8]:
-            return 'Summer'
-        else:
-            return 'Fall'
+    def forecast(self, current_date, days_ahead=7, demand_score=CURRENT_DEMAND_SCORE,
+                 advance_booking_days=None):
+        """Current price, future trend and booking recommendation for one request"""
+        
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        return price_forecast(self.predict_matrix, self.feature_columns, self.category_vocabularies,
+                              current_date, days_ahead, demand_score, advance_booking_days)
+    
+    @property
+    def version(self):
+        """Short hash of everything that determines predictions"""
+        return model_version(self.model_type, self.feature_columns, self.category_vocabularies,
+                             self.coef, self.intercept, self.model_token)
+    
+    def get_recommendation(self, current_price, future_prices):
+        """Generate booking recommendation based on price trend"""
+        return booking_recommendation(current_price, future_prices)
     
     def save_model(self, filepath):
         """Save trained model to file"""
         model_data = {
             'model': self.model,
-            'label_encoders': self.label_encoders,
+            'category_vocabularies': self.category_vocabularies,
             'feature_columns': self.feature_columns,
+            'entity_vocab': self.entity_vocab,
             'model_type': self.model_type,
+            'forgetting': self.forgetting,
+            'normal_equations': None if self.normal_equations is None else self.normal_equations.to_dict(),
+            'model_token': self.model_token,
+            'row_fingerprint': None if self.row_fingerprint is None else self.row_fingerprint.to_dict(),
+            'data_fingerprint': self.data_fingerprint,
             'is_trained': self.is_trained
         }
         joblib.dump(model_data, filepath)
@@ -226,14 +746,100 @@ class PriceForecastingModel:
         """Load trained model from file"""
         model_data = joblib.load(filepath)
         self.model = model_data['model']
-        self.label_encoders = model_data['label_encoders']
+        if 'category_vocabularies' in model_data:
+            self.category_vocabularies = model_data['category_vocabularies']
+        else:
+            # Older artifacts stored fitted LabelEncoders; their classes are the vocabulary
+            self.category_vocabularies = {
+                col: list(encoder.classes_) for col, encoder in model_data['label_encoders'].items()
+            }
         self.feature_columns = model_data['feature_columns']
+        self.entity_vocab = model_data.get('entity_vocab', [])
         self.model_type = model_data['model_type']
+        self.forgetting = model_data.get('forgetting', 1.0)
+        normal_equations = model_data.get('normal_equations')
+        self.normal_equations = None if normal_equations is None else NormalEquations.from_dict(normal_equations)
         self.is_trained = model_data['is_trained']
+        if self.is_trained:
+            self._sync_coefficients()
+            self.model_token = model_data.get('model_token', self.model_token)
+        row_fingerprint = model_data.get('row_fingerprint')
+        self.row_fingerprint = None if row_fingerprint is None else RowFingerprint.from_dict(row_fingerprint)
+        self.data_fingerprint = model_data.get('data_fingerprint')
         print(f"📂 Model loaded from {filepath}")
+    
+    def save_artifact(self, path):
+        """Save a linear model as a versioned artifact directory (see artifacts.py)
+        
+        Unlike `save_model`, the artifact holds no pickles: coefficients and
+        normal-equation statistics are .npy files and everything else is in
+        a JSON manifest, so it loads without sklearn and is safe to open
+        from untrusted sources.
+        """
+        if not self.is_trained or self.coef is None:
+            raise ValueError("Only trained linear models can be saved as artifacts")
+        
+        arrays = {'coef': self.coef}
+        manifest = {
+            'kind': 'price_model',
+            'model_type': self.model_type,
+            'estimator': type(self.model).__name__,
+            'feature_columns': self.feature_columns,
+            'category_vocabularies': self.category_vocabularies,
+            'entity_vocab': self.entity_vocab,
+            'intercept': self.intercept,
+            'forgetting': self.forgetting,
+            'version': self.version,
+            'data_fingerprint': self.data_fingerprint,
+            'row_fingerprint': None if self.row_fingerprint is None else self.row_fingerprint.to_dict()
+        }
+        if self.normal_equations is not None:
+            arrays['xtx'] = self.normal_equations.xtx
+            arrays['xty'] = self.normal_equations.xty
+            manifest['normal_equations'] = {'yty': self.normal_equations.yty, 'n_rows': self.normal_equations.n_rows}
+        
+        write_artifact(path, manifest, arrays)
+        print(f"💾 Model artifact saved to {path}")
+    
+    def load_artifact(self, path):
+        """Load a model saved with `save_artifact`"""
+        manifest, arrays = read_artifact(path, mmap=False)
+        if manifest.get('kind') != 'price_model':
+            raise ValueError(f"{path} is not a price model artifact")
+        
+        self.model_type = manifest['model_type']
+        self.model = LinearRegression()
+        self.category_vocabularies = manifest['category_vocabularies']
+        self.feature_columns = manifest['feature_columns']
+        self.entity_vocab = entity_keys_from_json(manifest['entity_vocab'])
+        self.forgetting = manifest['forgetting']
+        self.data_fingerprint = manifest['data_fingerprint']
+        row_fingerprint = manifest.get('row_fingerprint')
+        self.row_fingerprint = None if row_fingerprint is None else RowFingerprint.from_dict(row_fingerprint)
+        
+        self.normal_equations = None
+        if 'normal_equations' in manifest:
+            self.normal_equations = NormalEquations.from_dict(dict(
+                manifest['normal_equations'], xtx=arrays['xtx'], xty=arrays['xty']
+            ))
+        
+        self._set_coefficients(arrays['coef'], manifest['intercept'])
+        self.model_token = None
+        self.is_trained = True
+        print(f"📂 Model artifact loaded from {path}")
 
-def train_models():
-    """Train both hotel and flight models"""
+def train_models(chunksize=None, hotel_path='data/hotel_prices.csv', flight_path='data/flight_prices.csv',
+                 n_workers=None):
+    """Train both hotel and flight models
+    
+    With `chunksize`, sources are streamed in chunks of that many rows
+    (see `PriceForecastingModel.train_streaming`) instead of loaded whole;
+    with `n_workers` as well, their files/partitions are trained map-reduce
+    style across that many processes (see `train_distributed`).
+    """
+    
+    if n_workers and not chunksize:
+        raise ValueError("n_workers needs a chunksize: distributed training streams each partition in chunks")
     
     print("🚀 Starting model training process...")
     
@@ -242,32 +848,59 @@ def train_models():
     
     # Train hotel model
     print("\n🏨 Training Hotel Price Model")
-    hotel_data = pd.read_csv('data/hotel_prices.csv')
     hotel_model = PriceForecastingModel('hotel')
-    hotel_metrics = hotel_model.train(hotel_data)
+    if chunksize and n_workers:
+        hotel_metrics = hotel_model.train_distributed(hotel_path, n_workers, chunksize)
+    elif chunksize:
+        hotel_metrics = hotel_model.train_streaming(hotel_path, chunksize)
+    else:
+        hotel_metrics = hotel_model.train(pd.read_csv(hotel_path))
     hotel_model.save_model('models/hotel_model.pkl')
+    hotel_model.save_artifact('models/hotel_model')
     
     # Train flight model
     print("\n✈️ Training Flight Price Model")
-    flight_data = pd.read_csv('data/flight_prices.csv')
     flight_model = PriceForecastingModel('flight')
-    flight_metrics = flight_model.train(flight_data)
+    if chunksize and n_workers:
+        flight_metrics = flight_model.train_distributed(flight_path, n_workers, chunksize)
+    elif chunksize:
+        flight_metrics = flight_model.train_streaming(flight_path, chunksize)
+    else:
+        flight_metrics = flight_model.train(pd.read_csv(flight_path))
     flight_model.save_model('models/flight_model.pkl')
+    flight_model.save_artifact('models/flight_model')
     
     print("\n🎉 Model training completed successfully!")
     
     return hotel_metrics, flight_metrics
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Train hotel and flight price models")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="train out-of-core, reading this many rows at a time")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="with --chunksize, train across this many processes, one task per file/partition")
+    parser.add_argument('--hotel-data', default='data/hotel_prices.csv',
+                        help="hotel CSV, Parquet/Feather file or partitioned directory")
+    parser.add_argument('--flight-data', default='data/flight_prices.csv',
+                        help="flight CSV, Parquet/Feather file or partitioned directory")
+    args = parser.parse_args(argv)
+    if args.workers and not args.chunksize:
+        parser.error("--workers requires --chunksize")
+    return args
+
+def main(argv=None):
     """Main function to train models"""
+    args = parse_args(argv)
     
     # Check if data exists
-    if not os.path.exists('data/hotel_prices.csv') or not os.path.exists('data/flight_prices.csv'):
+    if not os.path.exists(args.hotel_data) or not os.path.exists(args.flight_data):
         print("❌ Data files not found. Please run data_generator.py first.")
         return
     
     # Train models
-    hotel_metrics, flight_metrics = train_models()
+    hotel_metrics, flight_metrics = train_models(args.chunksize, args.hotel_data, args.flight_data, args.workers)
     
     # Display summary
     print("\n📊 Training Summary:")
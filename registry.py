@@ -0,0 +1,154 @@
+"""
+AI-Driven Price Forecasting System - Model Registry
+Serves the newest valid model of each type and hot-swaps retrained ones without a restart
+"""
+
+import numpy as np
+import os
+import threading
+import time
+from datetime import date
+from artifacts import MANIFEST_NAME, is_artifact
+from inference import PriceInferenceModel
+
+MODEL_TYPES = ('hotel', 'flight')
+
+def model_source(models_dir, model_type, allow_pickle=True):
+    """Artifact directory of a model type, or its legacy pickle when there is no artifact
+
+    With `allow_pickle=False` the artifact path is returned even while it
+    is missing (e.g. mid-swap in `write_artifact`).
+    """
+    artifact = os.path.join(models_dir, f'{model_type}_model')
+    return artifact if not allow_pickle or is_artifact(artifact) else f'{artifact}.pkl'
+
+def source_fingerprint(path):
+    """Cheap change marker for a model source: inode, size and mtime of its manifest or pickle
+
+    Artifacts are replaced by renaming a new directory into place, so a new
+    version always shows up as a new manifest inode.
+    """
+    target = os.path.join(path, MANIFEST_NAME) if os.path.isdir(path) else path
+    stat = os.stat(target)
+    return (target, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def load_serving_model(path, model_type):
+    """NumPy-only inference model from an artifact, else from a legacy pickle"""
+    if os.path.isdir(path):
+        return PriceInferenceModel.from_artifact(path)
+
+    # Legacy pickles need the full training stack (sklearn) to unpickle
+    from model import PriceForecastingModel
+    model = PriceForecastingModel(model_type)
+    model.load_model(path)
+    return PriceInferenceModel.from_model(model) if model.coef is not None else model
+
+def validate_model(model, model_type):
+    """Raise ValueError unless `model` is a usable `model_type` model"""
+    if model.model_type != model_type:
+        raise ValueError(f"Expected a {model_type} model, got {model.model_type}")
+
+    forecast = model.forecast(date.today(), 7)
+    prices = np.append(forecast['future_prices'], forecast['current_price'])
+    if not np.all(np.isfinite(prices)):
+        raise ValueError(f"{model_type} model {model.version} predicts non-finite prices")
+
+class ModelRegistry:
+    """Latest valid model per type, reloaded in the background when its files change
+
+    `get`/`models` return plain references from an immutable snapshot that
+    is replaced wholesale on every swap, so readers never lock and a caller
+    holding a model keeps using it until it asks again (in-flight reruns
+    finish on the version they started with). A changed source is loaded
+    and validated off to the side; if that fails, the current version stays
+    in service and the error is reported by `status`; that source is not
+    retried until it changes again.
+
+    Once a type has been served from an artifact, its legacy pickle is
+    never used again: a briefly missing artifact directory (while a new
+    one is swapped in) is retried on the next poll instead.
+    """
+
+    def __init__(self, models_dir='models', model_types=MODEL_TYPES, poll_interval=5.0):
+        self.models_dir = models_dir
+        self.model_types = tuple(model_types)
+        self.poll_interval = poll_interval
+        self._snapshot = {}
+        self._fingerprints = {}
+        self._rejected = {}
+        self._artifact_types = set()
+        self._status = {model_type: {'version': None, 'loaded_at': None, 'error': None}
+                        for model_type in self.model_types}
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refresh()
+
+    def get(self, model_type):
+        """Current model of `model_type`, or None if none has loaded yet"""
+        return self._snapshot.get(model_type)
+
+    def models(self):
+        """Current models in `model_types` order, from one consistent snapshot"""
+        snapshot = self._snapshot
+        return tuple(snapshot.get(model_type) for model_type in self.model_types)
+
+    def refresh(self):
+        """Load, validate and swap in every model whose source changed; returns the types swapped"""
+        with self._refresh_lock:
+            swapped = {}
+            for model_type in self.model_types:
+                path = model_source(self.models_dir, model_type,
+                                    allow_pickle=model_type not in self._artifact_types)
+                fingerprint = None
+                try:
+                    fingerprint = source_fingerprint(path)
+                    if fingerprint == self._fingerprints.get(model_type):
+                        # Back to (or still) the version in service
+                        self._status[model_type]['error'] = None
+                        continue
+                    if fingerprint == self._rejected.get(model_type):
+                        continue
+                    model = load_serving_model(path, model_type)
+                    validate_model(model, model_type)
+                except Exception as error:
+                    # Missing sources are retried on the next poll, rejected ones once they change
+                    self._status[model_type]['error'] = f"{type(error).__name__}: {error}"
+                    if fingerprint is not None:
+                        self._rejected[model_type] = fingerprint
+                    continue
+
+                swapped[model_type] = model
+                self._fingerprints[model_type] = fingerprint
+                self._rejected.pop(model_type, None)
+                if os.path.isdir(path):
+                    self._artifact_types.add(model_type)
+                self._status[model_type] = {'version': model.version, 'loaded_at': time.time(), 'error': None}
+
+            if swapped:
+                # Publish a new snapshot in one reference assignment
+                self._snapshot = {**self._snapshot, **swapped}
+            return sorted(swapped)
+
+    def start(self):
+        """Start polling for changed models in a daemon thread (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the polling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def status(self):
+        """Version, load time and last load error of every model type"""
+        with self._refresh_lock:
+            return {model_type: dict(status) for model_type, status in self._status.items()}
@@ -0,0 +1,235 @@
+"""
+AI-Driven Price Forecasting System - Model Selection
+Parallel sweep over candidate estimators and feature subsets, ranked by accuracy and latency
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.ensemble import HistGradientBoostingRegressor
+from features import date_ordinals
+from model import PriceForecastingModel, iter_price_chunks
+
+# Where featurized datasets are cached as memory-mappable .npy files
+FEATURE_CACHE_DIR = 'data/features'
+
+# Candidate grid
+RIDGE_ALPHAS = [0.1, 1.0, 10.0, 100.0]
+TREE_DEPTHS = [3, 6, None]
+
+# Feature subsets by name, as the features each one drops
+FEATURE_SUBSETS = {
+    'all': [],
+    'compact': ['day', 'day_of_year', 'week_of_year'],
+    'no_demand': ['demand_score'],
+}
+
+# Rows per batch when timing batch inference
+LATENCY_BATCH_ROWS = 1000
+
+def source_signature(path):
+    """(relative path, size, mtime) of every file behind `path`"""
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return [(os.path.basename(path), stat.st_size, stat.st_mtime_ns)]
+    signature = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            signature.append((os.path.relpath(os.path.join(root, name), path), stat.st_size, stat.st_mtime_ns))
+    return sorted(signature)
+
+def cached_feature_matrix(path, model_type, cache_dir=FEATURE_CACHE_DIR):
+    """Featurize `path` once into date-sorted X.npy / y.npy and return their directory
+
+    The cache entry is keyed by the source files' sizes and mtimes, so a
+    changed source is featurized again; entries are written to a temporary
+    directory and renamed into place, so readers never see partial files.
+    """
+    key = hashlib.sha1(repr((os.path.abspath(path), model_type, source_signature(path))).encode())
+    entry = os.path.join(cache_dir, f'{model_type}_{key.hexdigest()[:12]}')
+    if os.path.exists(os.path.join(entry, 'meta.json')):
+        return entry
+
+    df = pd.concat(iter_price_chunks(path, 1_000_000), ignore_index=True)
+    model = PriceForecastingModel(model_type)
+    data, model.feature_columns = model._feature_arrays(df)
+
+    # Date order, so a time-based holdout is a plain row split
+    order = np.argsort(date_ordinals(df['date']), kind='stable')
+
+    staging = f'{entry}.{os.getpid()}.tmp'
+    os.makedirs(staging, exist_ok=True)
+    np.save(os.path.join(staging, 'X.npy'), model._stack_features(data, len(df))[order])
+    np.save(os.path.join(staging, 'y.npy'), df['price'].to_numpy(dtype=np.float64)[order])
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump({'source': path, 'model_type': model_type, 'feature_columns': model.feature_columns,
+                   'n_rows': len(df)}, f)
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        # Another process cached the same source first
+        shutil.rmtree(staging)
+    return entry
+
+def load_feature_matrix(entry):
+    """Memory-mapped X, y and feature names of a cached feature matrix"""
+    with open(os.path.join(entry, 'meta.json')) as f:
+        meta = json.load(f)
+    X = np.load(os.path.join(entry, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(entry, 'y.npy'), mmap_mode='r')
+    return X, y, meta['feature_columns']
+
+def candidate_grid(feature_columns):
+    """(name, unfitted estimator, feature list) for every candidate"""
+    estimators = [('linear', LinearRegression())]
+    estimators += [(f'ridge(alpha={alpha:g})', Ridge(alpha=alpha)) for alpha in RIDGE_ALPHAS]
+    estimators += [
+        (f'hist_gb(max_depth={depth})', HistGradientBoostingRegressor(max_depth=depth, random_state=42))
+        for depth in TREE_DEPTHS
+    ]
+
+    candidates = []
+    for subset, dropped in FEATURE_SUBSETS.items():
+        features = [col for col in feature_columns if col not in dropped]
+        if subset != 'all' and len(features) == len(feature_columns):
+            continue
+        for name, estimator in estimators:
+            candidates.append((f'{name}/{subset}', estimator, features))
+    return candidates
+
+def inference_function(estimator):
+    """The serving path for a fitted estimator: the NumPy kernel for linear models"""
+    if hasattr(estimator, 'coef_'):
+        coef = np.ascontiguousarray(estimator.coef_, dtype=np.float64)
+        intercept = float(estimator.intercept_)
+        return lambda X: X @ coef + intercept
+    return estimator.predict
+
+def _fit_candidate(task):
+    """Fit one candidate on the training rows of a cached feature matrix and score the held-out rows"""
+    entry, name, estimator, features, test_size = task
+    X, y, feature_columns = load_feature_matrix(entry)
+    columns = [feature_columns.index(col) for col in features]
+    split = int(len(y) * (1 - test_size))
+
+    start = time.perf_counter()
+    estimator = clone(estimator).fit(X[:split, columns], y[:split])
+    fit_seconds = time.perf_counter() - start
+
+    residual = y[split:] - inference_function(estimator)(X[split:, columns])
+    return {
+        'candidate': name,
+        'features': ','.join(features),
+        'n_features': len(features),
+        'test_mae': float(np.abs(residual).mean()),
+        'test_rmse': float(np.sqrt(np.mean(residual ** 2))),
+        'fit_seconds': fit_seconds,
+    }, estimator
+
+def measure_latency(predict, X, repeat=50):
+    """Median per-row latency in microseconds for single-row and batched calls"""
+    def median_seconds(rows):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            predict(rows)
+            timings.append(time.perf_counter() - start)
+        return np.median(timings)
+
+    batch = np.ascontiguousarray(X[:LATENCY_BATCH_ROWS])
+    single = np.ascontiguousarray(X[:1])
+    return median_seconds(single) * 1e6, median_seconds(batch) * 1e6 / len(batch)
+
+def run_sweep(path, model_type='hotel', n_workers=None, test_size=0.2, latency_budget_us=None,
+              cache_dir=FEATURE_CACHE_DIR):
+    """Evaluate the candidate grid and return a leaderboard sorted by held-out MAE
+
+    The dataset is featurized once into a memory-mapped matrix that every
+    worker shares; the last `test_size` of it (by date) is held out.
+    Candidates are fitted in parallel, then timed one at a time in this
+    process so latencies are not skewed by concurrent fits. With
+    `latency_budget_us`, `meets_budget` flags candidates whose single-row
+    latency is within budget.
+    """
+
+    entry = cached_feature_matrix(path, model_type, cache_dir)
+    X, y, feature_columns = load_feature_matrix(entry)
+    candidates = candidate_grid(feature_columns)
+    split = int(len(y) * (1 - test_size))
+
+    print(f"🧪 Sweeping {len(candidates)} {model_type} candidates on {len(y):,} rows "
+          f"with {n_workers or os.cpu_count()} workers...")
+
+    tasks = [(entry, name, estimator, features, test_size) for name, estimator, features in candidates]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        results = list(pool.map(_fit_candidate, tasks))
+
+    rows = []
+    for (row, estimator), (_, _, features) in zip(results, candidates):
+        columns = [feature_columns.index(col) for col in features]
+        row['latency_single_us'], row['latency_batch_us'] = measure_latency(
+            inference_function(estimator), X[split:, columns]
+        )
+        rows.append(row)
+
+    leaderboard = pd.DataFrame(rows).sort_values('test_mae', ignore_index=True)
+    if latency_budget_us is not None:
+        leaderboard['meets_budget'] = leaderboard['latency_single_us'] <= latency_budget_us
+    return leaderboard
+
+def best_within_budget(leaderboard, latency_budget_us):
+    """Most accurate leaderboard row whose single-row latency fits the budget, or None"""
+    eligible = leaderboard[leaderboard['latency_single_us'] <= latency_budget_us]
+    return None if eligible.empty else eligible.iloc[0]
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Model-selection sweep for the hotel and flight price models")
+    parser.add_argument('--workers', type=int, default=None, help="processes fitting candidates")
+    parser.add_argument('--test-size', type=float, default=0.2, help="share of the latest rows held out")
+    parser.add_argument('--latency-budget-us', type=float, default=100.0,
+                        help="single-row inference budget in microseconds")
+    parser.add_argument('--hotel-data', default='data/hotel_prices.csv',
+                        help="hotel CSV, Parquet/Feather file or partitioned directory")
+    parser.add_argument('--flight-data', default='data/flight_prices.csv',
+                        help="flight CSV, Parquet/Feather file or partitioned directory")
+    parser.add_argument('--out-dir', default='models', help="where leaderboard CSVs are written")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the sweep for both services and write their leaderboards"""
+    args = parse_args(argv)
+
+    if not os.path.exists(args.hotel_data) or not os.path.exists(args.flight_data):
+        print("❌ Data files not found. Please run data_generator.py first.")
+        return
+
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    for model_type, path in (('hotel', args.hotel_data), ('flight', args.flight_data)):
+        leaderboard = run_sweep(path, model_type, args.workers, args.test_size, args.latency_budget_us)
+        out_path = os.path.join(args.out_dir, f'{model_type}_leaderboard.csv')
+        leaderboard.to_csv(out_path, index=False)
+
+        print(f"🏆 {model_type.title()} leaderboard (top 5 of {len(leaderboard)}) saved to {out_path}")
+        for _, row in leaderboard.head(5).iterrows():
+            print(f"   {row['candidate']:<32} MAE ${row['test_mae']:.2f}  "
+                  f"{row['latency_single_us']:.1f} µs/request  {row['latency_batch_us']:.3f} µs/row")
+
+        best = best_within_budget(leaderboard, args.latency_budget_us)
+        if best is None:
+            print(f"⚠️ No candidate meets the {args.latency_budget_us:g} µs budget")
+        else:
+            print(f"✅ Best within {args.latency_budget_us:g} µs: {best['candidate']} (MAE ${best['test_mae']:.2f})")
+
+if __name__ == "__main__":
+    main()